@@ -119,6 +119,7 @@ from notifications_utils.formatters import (
     get_lines_with_normalised_whitespace,
 )
 from notifications_utils.recipients import format_phone_number_human_readable
+from notifications_utils.template import template_env
 from notifications_utils.url_safe_token import generate_token
 
 login_manager = LoginManager()
@@ -697,6 +698,42 @@ def init_jinja(application):
     jinja_loader = jinja2.FileSystemLoader(template_folders)
     application.jinja_loader = jinja_loader
 
+    if application.config["JINJA_BYTECODE_CACHE"]:
+        # With no directory Jinja creates its own, which is only accessible
+        # to the current user. A directory which is configured must already
+        # exist and belong to the app.
+        bytecode_cache = jinja2.FileSystemBytecodeCache(
+            application.config["JINJA_BYTECODE_CACHE_DIR"]
+        )
+        application.jinja_options = {
+            **application.jinja_options,
+            "bytecode_cache": bytecode_cache,
+        }
+        template_env.bytecode_cache = bytecode_cache
+
+
+def warm_jinja_cache(application):
+    """
+    Compile every template now, rather than on the first request which
+    uses each one. Called when a worker starts. Templates already compiled
+    by another worker are loaded from the bytecode cache.
+    """
+    start = monotonic()
+    template_count = 0
+
+    for environment in (application.jinja_env, template_env):
+        for name in environment.list_templates(extensions=("html", "njk", "jinja2")):
+            try:
+                environment.get_template(name)
+            except jinja2.TemplateError:
+                application.logger.exception(f"Couldn’t compile template {name}")
+            else:
+                template_count += 1
+
+    application.logger.info(
+        f"Compiled {template_count} templates in {monotonic() - start:.2f}s"
+    )
+
 
 def slugify(text):
     """
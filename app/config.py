@@ -75,6 +75,27 @@ class Config(object):
     REDIS_URL = cloud_config.redis_url
     REDIS_ENABLED = getenv("REDIS_ENABLED", "1") == "1"
 
+    # Uploads with at least this many rows are validated in a pool of
+    # processes, so that a big file doesn’t block the gevent worker
+    CSV_VALIDATION_PROCESS_POOL_ROW_THRESHOLD = int(
+        getenv("CSV_VALIDATION_PROCESS_POOL_ROW_THRESHOLD", 10_000)
+    )
+    CSV_VALIDATION_PROCESS_POOL_SIZE = int(
+        getenv("CSV_VALIDATION_PROCESS_POOL_SIZE", 2)
+    )
+    CSV_VALIDATION_CHUNK_SIZE = 5_000
+    CSV_VALIDATION_SUMMARY_CACHE_TTL = 3600
+    # Uploads are validated in the background as soon as they’ve been
+    # uploaded. If that stops making progress for this long the check page
+    # validates the file itself instead.
+    CSV_VALIDATION_PROGRESS_TTL = 120
+
+    # Compiled templates are written to disk, so that each worker doesn’t
+    # have to compile every template again after a deploy or restart. By
+    # default Jinja uses a directory only the current user can access.
+    JINJA_BYTECODE_CACHE = True
+    JINJA_BYTECODE_CACHE_DIR = getenv("JINJA_BYTECODE_CACHE_DIR")
+
     # TODO: reassign this
     NOTIFY_SERVICE_ID = "d6aa2c68-a2d9-4437-ab19-3ae8eb202553"
 
@@ -141,6 +162,7 @@ class Test(Development):
     API_PUBLIC_URL = "http://you-forgot-to-mock-an-api-call-to"
     REDIS_URL = "redis://you-forgot-to-mock-a-redis-call-to"
     LOGO_CDN_DOMAIN = "static-logos.test.com"
+    JINJA_BYTECODE_CACHE = False
 
 
 class Production(Config):
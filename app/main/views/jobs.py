@@ -236,6 +236,11 @@ def _get_job_counts(job):
 
 
 def add_preview_of_content_to_notifications(notifications):
+    # Every notification from the same version of a template shares one
+    # template object, so only the personalisation changes from row to row
+    templates = {}
+    previews = {}
+
     for notification in notifications:
         if "template" not in notification and "template_name" in notification:
             notification["template"] = {
@@ -249,31 +254,57 @@ def add_preview_of_content_to_notifications(notifications):
 
         yield (
             dict(
-                preview_of_content=get_preview_of_content(notification), **notification
+                preview_of_content=get_preview_of_content(
+                    notification, templates=templates, previews=previews
+                ),
+                **notification,
             )
         )
 
 
-def get_preview_of_content(notification):
+def get_preview_of_content(notification, templates=None, previews=None):
     if "template" not in notification:
         return notification.get("template_name", "")
 
     if notification["template"].get("redact_personalisation"):
         notification["personalisation"] = {}
 
-    if notification["template"]["template_type"] == "sms":
-        return str(
-            SMSBodyPreviewTemplate(
-                notification["template"],
-                notification["personalisation"],
-            )
-        )
+    if notification["template"]["template_type"] not in {"sms", "email"}:
+        return None
+
+    key = (notification["template"].get("id"), notification["template"].get("version"))
+
+    if templates is None or key[0] is None:
+        template = make_preview_template(notification["template"])
+    else:
+        if key not in templates:
+            templates[key] = make_preview_template(notification["template"])
+        template = templates[key]
+
+    template.values = notification["personalisation"]
+
+    if (
+        previews is None
+        or key[0] is None
+        or (template.values and template.placeholders)
+    ):
+        return render_preview_of_content(template)
+
+    # Without personalisation every row gets the same preview
+    if key not in previews:
+        previews[key] = render_preview_of_content(template)
+    return previews[key]
+
+
+def make_preview_template(template):
+    if template["template_type"] == "sms":
+        return SMSBodyPreviewTemplate(template)
+
+    return EmailPreviewTemplate(template, redact_missing_personalisation=True)
+
+
+def render_preview_of_content(template):
+    if template.template_type == "sms":
+        return str(template)
 
-    if notification["template"]["template_type"] == "email":
-        return Markup(
-            EmailPreviewTemplate(
-                notification["template"],
-                notification["personalisation"],
-                redact_missing_personalisation=True,
-            ).subject
-        )  # nosec
+    return Markup(template.subject)  # nosec
@@ -9,6 +9,7 @@ from flask import (
     abort,
     current_app,
     flash,
+    make_response,
     redirect,
     render_template,
     request,
@@ -28,6 +29,7 @@ from app import (
     service_api_client,
 )
 from app.enums import ServicePermission
+from app.extensions import redis_client
 from app.main import main
 from app.main.forms import (
     ChooseTimeForm,
@@ -49,7 +51,15 @@ from app.utils import (
     should_skip_template_page,
     unicode_truncate,
 )
-from app.utils.csv import Spreadsheet, get_errors_for_csv
+from app.utils.csv import (
+    Spreadsheet,
+    get_errors_for_csv,
+    get_upload_content_hash,
+    get_validation_progress,
+    get_validation_summary_cache_key,
+    summarise_recipients,
+    validate_recipients_in_background,
+)
 from app.utils.templates import get_template
 from app.utils.user import user_has_permissions
 from notifications_python_client.errors import HTTPError
@@ -132,16 +142,24 @@ def send_messages(service_id, template_id):
     form = CsvUploadForm()
     if form.validate_on_submit():
         try:
-            upload_id = s3upload(
-                service_id,
-                Spreadsheet.from_file_form(form).as_dict,
-            )
+            spreadsheet = Spreadsheet.from_file_form(form)
+            upload_id = s3upload(service_id, spreadsheet.as_streamed_dict)
             file_name_metadata = unicode_truncate(
                 SanitiseASCII.encode(form.file.data.filename), 1600
             )
             set_metadata_on_csv_upload(
                 service_id, upload_id, original_file_name=file_name_metadata
             )
+            _validate_upload_in_background(
+                service_id,
+                template_id,
+                upload_id,
+                db_template,
+                remaining_messages,
+                line_count=spreadsheet.csv_lines_read,
+                email_reply_to=email_reply_to,
+                sms_sender=sms_sender,
+            )
             return redirect(
                 url_for(
                     ".check_messages",
@@ -492,6 +510,122 @@ def send_one_off_step(service_id, template_id, step_index):
     )
 
 
+def _get_recipient_csv_options(
+    service_id,
+    template_id,
+    upload_id,
+    db_template,
+    template,
+    remaining_messages,
+    *,
+    email_reply_to,
+    sms_sender,
+):
+    """
+    The arguments to validate an upload with, and the key its validation
+    summary is cached under, shared by the check page and the background
+    validation started when the file is uploaded.
+    """
+    allow_list = []
+    if current_service.trial_mode:
+        # Adding the simulated numbers to allow list
+        # so they can be sent in trial mode
+        for user in Users(service_id):
+            allow_list.extend([user.name, user.mobile_number, user.email_address])
+        # Failed sms number
+        allow_list.extend(
+            ["simulated user (fail)", "+14254147167", "simulated@simulated.gov"]
+        )
+        # Success sms number
+        allow_list.extend(
+            ["simulated user (success)", "+14254147755", "simulatedtwo@simulated.gov"]
+        )
+    else:
+        allow_list = None
+    allow_international_sms = current_service.has_permission(
+        ServicePermission.INTERNATIONAL_SMS
+    )
+
+    recipient_csv_options = dict(
+        template=template,
+        max_initial_rows_shown=50,
+        max_errors_shown=50,
+        guestlist=allow_list,
+        remaining_messages=remaining_messages,
+        allow_international_sms=allow_international_sms,
+    )
+    cache_key = get_validation_summary_cache_key(
+        service_id,
+        upload_id,
+        template_id,
+        db_template["version"],
+        email_reply_to=email_reply_to,
+        sms_sender=sms_sender,
+        guestlist=allow_list,
+        allow_international_sms=allow_international_sms,
+    )
+    return recipient_csv_options, cache_key
+
+
+def _validate_upload_in_background(
+    service_id,
+    template_id,
+    upload_id,
+    db_template,
+    remaining_messages,
+    *,
+    line_count,
+    email_reply_to,
+    sms_sender,
+):
+    if not redis_client.active:
+        # The check page couldn’t see the result, so it validates the
+        # file itself
+        return
+
+    # There can’t be more rows than lines (after the header). A file too
+    # small for the process pool is quicker to validate on the check page
+    # than to wait for there.
+    if line_count - 1 < current_app.config["CSV_VALIDATION_PROCESS_POOL_ROW_THRESHOLD"]:
+        return
+
+    template = get_template(
+        db_template,
+        current_service,
+        show_recipient=False,
+        email_reply_to=email_reply_to,
+        sms_sender=sms_sender,
+    )
+    recipient_csv_options, cache_key = _get_recipient_csv_options(
+        service_id,
+        template_id,
+        upload_id,
+        db_template,
+        template,
+        remaining_messages,
+        email_reply_to=email_reply_to,
+        sms_sender=sms_sender,
+    )
+    validate_recipients_in_background(
+        lambda: RecipientCSV(
+            s3download(service_id, upload_id), **recipient_csv_options
+        ),
+        cache_key,
+    )
+
+
+def _validation_in_progress(rows_validated):
+    response = make_response(
+        render_template(
+            "views/check/validating.html",
+            rows_validated=rows_validated,
+        )
+    )
+    # Reload the page until the file has been validated
+    response.headers["Refresh"] = "2"
+    return response
+
+
 def _check_messages(service_id, template_id, upload_id, preview_row, **kwargs):
     try:
         # The happy path is that the job doesn’t already exist, so the
@@ -514,7 +648,6 @@ def _check_messages(service_id, template_id, upload_id, preview_row, **kwargs):
     notification_count = service_api_client.get_notification_count(service_id)
     remaining_messages = current_service.message_limit - notification_count
 
-    contents = s3download(service_id, upload_id)
     db_template = current_service.get_template_with_user_permission_or_403(
         template_id, current_user
     )
@@ -535,32 +668,39 @@ def _check_messages(service_id, template_id, upload_id, preview_row, **kwargs):
         **kwargs,
     )
 
-    allow_list = []
-    if current_service.trial_mode:
-        # Adding the simulated numbers to allow list
-        # so they can be sent in trial mode
-        for user in Users(service_id):
-            allow_list.extend([user.name, user.mobile_number, user.email_address])
-        # Failed sms number
-        allow_list.extend(
-            ["simulated user (fail)", "+14254147167", "simulated@simulated.gov"]
-        )
-        # Success sms number
-        allow_list.extend(
-            ["simulated user (success)", "+14254147755", "simulatedtwo@simulated.gov"]
-        )
-    else:
-        allow_list = None
-    recipients = RecipientCSV(
-        contents,
-        template=template,
-        max_initial_rows_shown=50,
-        max_errors_shown=50,
-        guestlist=allow_list,
-        remaining_messages=remaining_messages,
-        allow_international_sms=current_service.has_permission(
-            ServicePermission.INTERNATIONAL_SMS
-        ),
+    recipient_csv_options, cache_key = _get_recipient_csv_options(
+        service_id,
+        template_id,
+        upload_id,
+        db_template,
+        template,
+        remaining_messages,
+        email_reply_to=email_reply_to,
+        sms_sender=sms_sender,
+    )
+
+    rows_validated = get_validation_progress(cache_key)
+    if rows_validated is not None:
+        # Raised rather than returned, like the redirect above
+        if request.method != "GET":
+            # The progress page reloads itself with a GET, so wait on the
+            # check page instead
+            abort(
+                redirect(
+                    url_for(
+                        "main.check_messages",
+                        service_id=service_id,
+                        template_id=template_id,
+                        upload_id=upload_id,
+                    )
+                )
+            )
+        abort(_validation_in_progress(rows_validated))
+
+    contents = s3download(service_id, upload_id)
+    recipients = RecipientCSV(contents, **recipient_csv_options)
+    content_hash = get_upload_content_hash(
+        contents, template_id, db_template["version"]
     )
 
     if request.args.get("from_test"):
@@ -607,11 +747,17 @@ def _check_messages(service_id, template_id, upload_id, preview_row, **kwargs):
         }
         choose_time_form = ChooseTimeForm()
 
+    # Validate the whole file in one pass before picking out the preview
+    # row, because building rows sets values on the shared template
+    summary = summarise_recipients(recipients, cache_key=cache_key)
+
     if preview_row < 2:
         abort(404)
 
     if preview_row < len(recipients) + 2:
-        template.values = recipients[preview_row - 2].recipient_and_personalisation
+        template.values = recipients.get_row(
+            preview_row - 2
+        ).recipient_and_personalisation
     elif preview_row > 2:
         abort(404)
 
@@ -619,12 +765,25 @@ def _check_messages(service_id, template_id, upload_id, preview_row, **kwargs):
         "original_file_name", ""
     )
 
+    if request.args.get("send_again"):
+        # They’ve been told these messages were sent already today and
+        # chosen to send them again
+        sent_previously = False
+    else:
+        sent_previously = job_api_client.has_sent_previously(
+            service_id,
+            content_hash,
+            template_id=template.id,
+            template_version=db_template["version"],
+            original_file_name=original_file_name,
+        )
+
     return dict(
         recipients=recipients,
         template=template,
         errors=recipients.has_errors,
-        row_errors=get_errors_for_csv(recipients, template.template_type),
-        count_of_recipients=len(recipients),
+        row_errors=get_errors_for_csv(summary, template.template_type),
+        count_of_recipients=summary.row_count,
         count_of_displayed_recipients=len(list(recipients.displayed_rows)),
         original_file_name=original_file_name,
         upload_id=upload_id,
@@ -635,9 +794,8 @@ def _check_messages(service_id, template_id, upload_id, preview_row, **kwargs):
         back_link_from_preview=back_link_from_preview,
         first_recipient_column=recipients.recipient_column_headers[0],
         preview_row=preview_row,
-        sent_previously=job_api_client.has_sent_previously(
-            service_id, template.id, db_template["version"], original_file_name
-        ),
+        sent_previously=sent_previously,
+        content_hash=content_hash,
         template_id=template_id,
     )
 
@@ -700,6 +858,12 @@ def preview_job(service_id, template_id, upload_id, row_index=2):
     data = _check_messages(
         service_id, template_id, upload_id, row_index, force_hide_sender=True
     )
+    # Kept for each upload, so previewing another file in another tab
+    # doesn’t change which file this job is recorded as
+    session["content_hashes"] = {
+        **session.get("content_hashes", {}),
+        str(upload_id): data["content_hash"],
+    }
 
     return render_template(
         "views/check/preview.html",
@@ -712,10 +876,14 @@ def preview_job(service_id, template_id, upload_id, row_index=2):
 @user_has_permissions(ServicePermission.SEND_MESSAGES, restrict_admin_usage=True, allow_org_user=True)
 def start_job(service_id, upload_id):
     scheduled_for = session.pop("scheduled_for", None)
+    content_hashes = session.get("content_hashes", {})
+    content_hash = content_hashes.pop(str(upload_id), None)
+    session["content_hashes"] = content_hashes
     job_api_client.create_job(
         upload_id,
         service_id,
         scheduled_for=scheduled_for,
+        content_hash=content_hash,
     )
 
     session.pop("sender_id", None)
@@ -846,7 +1014,9 @@ def get_skip_link(step_index, template):
         and step_index == 0
         and template.template_type in ("sms", "email")
         and not (template.template_type == "sms" and current_user.mobile_number is None)
-        and current_user.has_permissions(ServicePermission.SEND_MESSAGES, allow_org_user=True)
+        and current_user.has_permissions(
+            ServicePermission.SEND_MESSAGES, allow_org_user=True
+        )
     ):
         return (
             "Use my {}".format(first_column_headings[template.template_type][0]),
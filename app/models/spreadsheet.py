@@ -1,36 +1,73 @@
+import codecs
 import csv
 from io import StringIO
+from itertools import chain
 from os import path
 
 import pyexcel
-import pyexcel_xlsx
 
 
 class Spreadsheet:
     ALLOWED_FILE_EXTENSIONS = ("csv", "xlsx", "xls", "ods", "xlsm", "tsv")
 
-    def __init__(self, csv_data=None, rows=None, filename=""):
+    def __init__(self, csv_data=None, rows=None, filename="", csv_lines=None):
         self.filename = filename
 
-        if csv_data and rows:
+        if sum(map(bool, (csv_data, rows, csv_lines))) > 1:
             raise TypeError("Spreadsheet must be created from either rows or CSV data")
 
         self._csv_data = csv_data or ""
+        self._csv_lines = csv_lines
         self._rows = rows or []
+        self.csv_lines_read = 0
 
     @property
     def as_dict(self):
         return {"file_name": self.filename, "data": self.as_csv_data}
 
+    @property
+    def as_streamed_dict(self):
+        # Like `as_dict`, but the data is converted a line at a time as it’s
+        # read, so it can be uploaded without holding the whole file in memory
+        return {"file_name": self.filename, "data": self.iter_csv_lines()}
+
     @property
     def as_csv_data(self):
         if not self._csv_data:
+            if self._csv_lines is not None:
+                self._csv_data = "\r\n".join(self._csv_lines)
+            else:
+                with StringIO() as converted:
+                    output = csv.writer(converted)
+                    for row in self._rows:
+                        output.writerow(row)
+                    self._csv_data = converted.getvalue()
+        return self._csv_data
+
+    def iter_csv_lines(self):
+        """
+        The spreadsheet as lines of CSV data, without line endings. Rows are
+        converted one at a time, so only one row is held in memory. The
+        lines are counted in `csv_lines_read` as they’re read, so once a
+        streamed file has been uploaded it’s known how big it was.
+        """
+        for line in self._iter_csv_lines():
+            self.csv_lines_read += 1
+            yield line
+
+    def _iter_csv_lines(self):
+        if self._csv_data:
+            yield from self._csv_data.splitlines()
+        elif self._csv_lines is not None:
+            yield from self._csv_lines
+        else:
             with StringIO() as converted:
                 output = csv.writer(converted)
                 for row in self._rows:
                     output.writerow(row)
-                self._csv_data = converted.getvalue()
-        return self._csv_data
+                    yield from converted.getvalue().splitlines()
+                    converted.seek(0)
+                    converted.truncate()
 
     @classmethod
     def can_handle(cls, filename):
@@ -44,6 +81,21 @@ class Spreadsheet:
     def normalise_newlines(file_content):
         return "\r\n".join(file_content.read().decode("utf-8").splitlines())
 
+    @staticmethod
+    def iter_lines(file_content):
+        # `StreamReader.readline` splits lines in the same places as
+        # `str.splitlines`, so this gives the same lines as
+        # `normalise_newlines` without decoding the whole file at once
+        for line in codecs.getreader("utf-8")(file_content):
+            yield from line.splitlines()
+
+    @staticmethod
+    def iter_rows(rows):
+        try:
+            yield from rows
+        finally:
+            pyexcel.free_resources()
+
     @classmethod
     def from_rows(cls, rows, filename=""):
         return cls(rows=rows, filename=filename)
@@ -60,27 +112,27 @@ class Spreadsheet:
         extension = cls.get_extension(filename)
 
         if extension == "csv":
+            lines = cls.iter_lines(file_content)
+            # Read the first line now, so a file which can’t be decoded
+            # fails here rather than part way through being uploaded
             return cls(
-                csv_data=Spreadsheet.normalise_newlines(file_content), filename=filename
+                csv_lines=chain([next(lines, "")], lines),
+                filename=filename,
             )
 
         if extension == "tsv":
             file_content = StringIO(Spreadsheet.normalise_newlines(file_content))
 
-        if extension == "xlsm":
-            file_data = pyexcel_xlsx.get_data(file_content)
-            instance = cls.from_rows(
-                # Get the first sheet from the workbook
-                list(file_data.values())[0],
-                filename,
-            )
-            return instance
-
-        instance = cls.from_rows(
-            pyexcel.iget_array(file_type=extension, file_stream=file_content), filename
+        rows = cls.iter_rows(
+            pyexcel.iget_array(file_type=extension, file_stream=file_content)
+        )
+        # Likewise, read the first row now so a file which isn’t really a
+        # spreadsheet fails before anything is uploaded
+        first_row = next(rows, None)
+        return cls.from_rows(
+            chain([first_row], rows) if first_row is not None else [],
+            filename,
         )
-        pyexcel.free_resources()
-        return instance
 
     @classmethod
     def from_file_form(cls, form):
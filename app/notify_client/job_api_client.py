@@ -18,6 +18,8 @@ class JobApiClient(NotifyAdminAPIClient):
         JobStatus.READY_TO_SEND,
         JobStatus.SENT_TO_DVLA,
     }
+    ONE_DAY = 24 * 60 * 60
+
     SCHEDULED_JOB_STATUS = JobStatus.SCHEDULED
     CANCELLED_JOB_STATUS = JobStatus.CANCELLED
     NON_CANCELLED_JOB_STATUSES = JOB_STATUSES - {CANCELLED_JOB_STATUS}
@@ -61,17 +63,43 @@ class JobApiClient(NotifyAdminAPIClient):
             params["limit_days"] = limit_days
         return self.get(url=f"/service/{service_id}/upload", params=params)
 
+    @staticmethod
+    def get_sent_today_cache_key(service_id, content_hash):
+        today = datetime.datetime.now(datetime.timezone.utc).date()
+        return f"service-{service_id}-jobs-sent-{today}-{content_hash}"
+
     def has_sent_previously(
-        self, service_id, template_id, template_version, original_file_name
+        self,
+        service_id,
+        content_hash,
+        *,
+        template_id,
+        template_version,
+        original_file_name,
     ):
-        return (template_id, template_version, original_file_name) in (
-            (
-                job["template"],
-                job["template_version"],
-                job["original_file_name"],
+        """
+        Whether a job with the same file and template version (see
+        `get_upload_content_hash`) has been created today and not
+        cancelled, whatever the file was called.
+
+        Without Redis nothing is recorded, so this falls back to looking
+        for one of today’s jobs with the same template version and file
+        name.
+        """
+        if not redis_client.active:
+            return (template_id, template_version, original_file_name) in (
+                (
+                    job["template"],
+                    job["template_version"],
+                    job["original_file_name"],
+                )
+                for job in self.get_jobs(service_id, limit_days=0)["data"]
+                if job["job_status"] != JobStatus.CANCELLED
             )
-            for job in self.get_jobs(service_id, limit_days=0)["data"]
-            if job["job_status"] != JobStatus.CANCELLED
+
+        return (
+            redis_client.get(self.get_sent_today_cache_key(service_id, content_hash))
+            is not None
         )
 
     def get_page_of_jobs(
@@ -134,6 +162,7 @@ class JobApiClient(NotifyAdminAPIClient):
         original_file_name=None,
         notification_count=None,
         valid=None,
+        content_hash=None,
     ):
         data = {"id": job_id}
 
@@ -161,13 +190,34 @@ class JobApiClient(NotifyAdminAPIClient):
             ex=int(cache.DEFAULT_TTL),
         )
 
+        if content_hash:
+            sent_today_cache_key = self.get_sent_today_cache_key(
+                service_id, content_hash
+            )
+            redis_client.set(sent_today_cache_key, job_id, ex=self.ONE_DAY)
+            # So that cancelling the job can remove it again
+            redis_client.set(
+                f"job-{job_id}-sent-today-cache-key",
+                sent_today_cache_key,
+                ex=self.ONE_DAY,
+            )
+
         return job
 
     @cache.delete("has_jobs-{service_id}")
     def cancel_job(self, service_id, job_id):
-        return self.post(
+        job = self.post(
             url="/service/{}/job/{}/cancel".format(service_id, job_id), data={}
         )
 
+        sent_today_cache_key = redis_client.get(f"job-{job_id}-sent-today-cache-key")
+        if sent_today_cache_key is not None:
+            redis_client.delete(
+                sent_today_cache_key.decode("utf-8"),
+                f"job-{job_id}-sent-today-cache-key",
+            )
+
+        return job
+
 
 job_api_client = JobApiClient()
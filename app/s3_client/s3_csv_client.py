@@ -1,3 +1,4 @@
+import io
 import os
 import uuid
 
@@ -33,10 +34,48 @@ def get_csv_upload(service_id, upload_id):
     return get_s3_object(*get_csv_location(service_id, upload_id))
 
 
+class LinesReader(io.RawIOBase):
+    """
+    Reads an iterator of lines as a file of UTF-8 encoded bytes, with the
+    lines separated by CRLF, so that they can be streamed to S3 without
+    joining them into one big string first.
+    """
+
+    def __init__(self, lines):
+        self._lines = iter(lines)
+        self._buffer = b""
+        self._separator = b""
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._buffer:
+            line = next(self._lines, None)
+            if line is None:
+                return 0
+            self._buffer = self._separator + line.encode("utf-8")
+            self._separator = b"\r\n"
+
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
 def remove_blank_lines(filedata):
-    # sometimes people upload files with hundreds of blank lines at the end
+    # sometimes people upload files with hundreds of blank lines at the end.
+    # Whitespace around each line is removed too, so the same file saved by
+    # different programs is stored the same way
     data = filedata["data"]
-    cleaned_data = "\r\n".join(line for line in data.splitlines() if line.strip())
+    if isinstance(data, str):
+        cleaned_data = "\r\n".join(
+            line for line in map(str.strip, data.splitlines()) if line
+        )
+    else:
+        cleaned_data = io.BufferedReader(
+            LinesReader(line for line in map(str.strip, data) if line)
+        )
     filedata["data"] = cleaned_data
     return filedata
 
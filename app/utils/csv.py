@@ -1,20 +1,258 @@
 import datetime
+import hashlib
+import pickle
+import sys
+from functools import partial
+from os import path
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
+import gevent
+import gevent.pool
+import gevent.subprocess
 from flask import current_app, json
 from flask_login import current_user
+from gevent.lock import BoundedSemaphore
 
+from app.extensions import redis_client
 from app.models.spreadsheet import Spreadsheet
 from app.utils import hilite
 from app.utils.templates import get_sample_template
-from notifications_utils.recipients import RecipientCSV
+from notifications_utils.recipients import RecipientCSV, ValidationSummary
 
+_validation_pool = None
 
-def get_errors_for_csv(recipients, template_type):
+
+class ValidationProcessPool:
+    """
+    Processes for validating big files, which this worker sends work to
+    over pipes with `gevent.subprocess`, so waiting on them lets the
+    worker’s other greenlets run.
+
+    A `ProcessPoolExecutor` can’t be used under gevent. Its feeder thread
+    becomes a greenlet, which blocks the whole worker writing to a full
+    pipe while the processes wait for their results to be read.
+    """
+
+    worker_command = [sys.executable, "-m", "notifications_utils.worker_process"]
+
+    def __init__(self, size):
+        self.size = size
+        self._idle_processes = []
+        self._process_slots = BoundedSemaphore(size)
+
+    def map(self, fn, *iterables):
+        # Like `ProcessPoolExecutor.map`, results are yielded in order
+        return gevent.pool.Pool(self.size).imap(partial(self._call, fn), *iterables)
+
+    def _call(self, fn, *args):
+        with self._process_slots:
+            if self._idle_processes:
+                process = self._idle_processes.pop()
+            else:
+                process = self._start_process()
+
+            try:
+                pickle.dump((fn, args), process.stdin)
+                process.stdin.flush()
+                succeeded, result = pickle.load(process.stdout)
+            except BaseException:
+                # Don’t reuse a process which might be halfway through a call
+                process.kill()
+                process.wait()
+                raise
+
+            self._idle_processes.append(process)
+
+        if not succeeded:
+            raise result
+        return result
+
+    def _start_process(self):
+        return gevent.subprocess.Popen(
+            self.worker_command,
+            stdin=gevent.subprocess.PIPE,
+            stdout=gevent.subprocess.PIPE,
+            # So that `notifications_utils` can be imported
+            cwd=path.abspath(path.join(path.dirname(__file__), "..", "..")),
+        )
+
+
+def get_validation_pool():
+    # One pool per gunicorn worker, created on first use so its processes
+    # are started after the worker has forked
+    global _validation_pool
+    if _validation_pool is None:
+        _validation_pool = ValidationProcessPool(
+            current_app.config["CSV_VALIDATION_PROCESS_POOL_SIZE"]
+        )
+    return _validation_pool
+
+
+def get_validation_summary_cache_key(
+    service_id, upload_id, template_id, template_version, **options
+):
+    # Editing the template creates a new version, so a summary for the old
+    # version is never read again and just expires. The same goes for
+    # summaries stored in an older format.
+    options_hash = hashlib.sha256(
+        json.dumps(options, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+    return (
+        f"csv-validation-summary-v{ValidationSummary.serialized_version}-"
+        f"{service_id}-{upload_id}-{template_id}-{template_version}-{options_hash}"
+    )
+
+
+def get_upload_content_hash(file_data, template_id, template_version):
+    """
+    Identifies what sending a file would send, so the same file uploaded
+    again under a different name can be spotted. Every upload is stored
+    with the same line endings, without blank lines and without whitespace
+    around each line (see `s3upload`), so the file is hashed as it is,
+    without copying it to normalise it.
+    """
+    content_hash = hashlib.sha256(f"{template_id}-{template_version}\n".encode("utf-8"))
+    content_hash.update(file_data.encode("utf-8"))
+    return content_hash.hexdigest()
+
+
+def get_validation_progress_cache_key(cache_key):
+    return f"{cache_key}-progress"
+
+
+def summarise_recipients(recipients, cache_key=None, record_progress=False):
+    """
+    Validating a big file is CPU-bound and would block every other greenlet
+    in this worker, so above a certain number of rows it’s split into
+    chunks and validated in the process pool instead.
+
+    If a `cache_key` is given the summary is kept in Redis, so the check,
+    preview and send pages don’t validate the same file again. With
+    `record_progress` the number of rows validated so far is kept in Redis
+    too, each time a chunk is finished.
+    """
+    if cache_key:
+        summary = get_cached_validation_summary(cache_key, recipients)
+        if summary is not None:
+            recipients.summary = summary
+            return summary
+
+    if (
+        recipients.count_rows()
+        < current_app.config["CSV_VALIDATION_PROCESS_POOL_ROW_THRESHOLD"]
+    ):
+        summary = recipients.summary
+    else:
+        map_fn = get_validation_pool().map
+        if record_progress:
+            map_fn = partial(
+                _map_and_record_progress,
+                map_fn,
+                get_validation_progress_cache_key(cache_key),
+            )
+        summary = recipients.summarise_in_chunks(
+            current_app.config["CSV_VALIDATION_CHUNK_SIZE"],
+            map_fn=map_fn,
+        )
+
+    if cache_key:
+        redis_client.set(
+            cache_key,
+            json.dumps(summary.serialize()),
+            ex=current_app.config["CSV_VALIDATION_SUMMARY_CACHE_TTL"],
+        )
+
+    return summary
+
+
+def _map_and_record_progress(map_fn, progress_cache_key, fn, chunks):
+    rows_validated = 0
+    for chunk_summary in map_fn(fn, chunks):
+        rows_validated += chunk_summary.row_count
+        redis_client.set(
+            progress_cache_key,
+            rows_validated,
+            ex=current_app.config["CSV_VALIDATION_PROGRESS_TTL"],
+        )
+        yield chunk_summary
+
+
+def validate_recipients_in_background(get_recipients, cache_key):
+    """
+    Start validating an upload in a greenlet as soon as it has been
+    uploaded, so that by the time the check page asks for the summary
+    it’s already in Redis.
+
+    `get_recipients` is called in the greenlet, so the file is downloaded
+    there too. This needs Redis for the check page to see the result.
+    """
+    redis_client.set(
+        get_validation_progress_cache_key(cache_key),
+        0,
+        ex=current_app.config["CSV_VALIDATION_PROGRESS_TTL"],
+    )
+    return gevent.spawn(
+        _validate_recipients,
+        current_app._get_current_object(),
+        get_recipients,
+        cache_key,
+    )
+
+
+def _validate_recipients(app, get_recipients, cache_key):
+    with app.app_context():
+        try:
+            summarise_recipients(
+                get_recipients(), cache_key=cache_key, record_progress=True
+            )
+        except Exception:
+            current_app.logger.exception(
+                hilite(f"Could not validate upload in the background: {cache_key}")
+            )
+        finally:
+            redis_client.delete(get_validation_progress_cache_key(cache_key))
+
+
+def get_validation_progress(cache_key):
+    """
+    How many rows of an upload have been validated in the background so
+    far, or `None` if it isn’t being validated in the background.
+    """
+    progress = redis_client.get(get_validation_progress_cache_key(cache_key))
+    if progress is None:
+        return None
+    return int(progress)
+
+
+def get_cached_validation_summary(cache_key, recipients):
+    """
+    The summary of `recipients` kept in Redis, with its rows read from
+    `recipients` again, or `None` if there isn’t one which can be used.
+    """
+    cached = redis_client.get(cache_key)
+    if cached is None:
+        return None
+
+    try:
+        summary = ValidationSummary.from_serialized(json.loads(cached), recipients)
+    except (ValueError, KeyError, TypeError, IndexError):
+        current_app.logger.warning(
+            hilite(f"Could not read validation summary: {cache_key}")
+        )
+        return None
+
+    # A summary which stopped early didn’t validate every row
+    if summary.stopped_early:
+        return None
+
+    return summary
+
+
+def get_errors_for_csv(summary, template_type):
     errors = []
 
-    if any(recipients.rows_with_bad_recipients):
-        number_of_bad_recipients = len(list(recipients.rows_with_bad_recipients))
+    if summary.count_of_rows_with_bad_recipients:
+        number_of_bad_recipients = summary.count_of_rows_with_bad_recipients
         if "sms" == template_type:
             if 1 == number_of_bad_recipients:
                 errors.append("fix 1 phone number")
@@ -26,8 +264,8 @@ def get_errors_for_csv(recipients, template_type):
             else:
                 errors.append("fix {} email addresses".format(number_of_bad_recipients))
 
-    if any(recipients.rows_with_missing_data):
-        number_of_rows_with_missing_data = len(list(recipients.rows_with_missing_data))
+    if summary.count_of_rows_with_missing_data:
+        number_of_rows_with_missing_data = summary.count_of_rows_with_missing_data
         if 1 == number_of_rows_with_missing_data:
             errors.append("enter missing data in 1 row")
         else:
@@ -35,9 +273,9 @@ def get_errors_for_csv(recipients, template_type):
                 "enter missing data in {} rows".format(number_of_rows_with_missing_data)
             )
 
-    if any(recipients.rows_with_message_too_long):
-        number_of_rows_with_message_too_long = len(
-            list(recipients.rows_with_message_too_long)
+    if summary.count_of_rows_with_message_too_long:
+        number_of_rows_with_message_too_long = (
+            summary.count_of_rows_with_message_too_long
         )
         if 1 == number_of_rows_with_message_too_long:
             errors.append("shorten the message in 1 row")
@@ -48,10 +286,8 @@ def get_errors_for_csv(recipients, template_type):
                 )
             )
 
-    if any(recipients.rows_with_empty_message):
-        number_of_rows_with_empty_message = len(
-            list(recipients.rows_with_empty_message)
-        )
+    if summary.count_of_rows_with_empty_message:
+        number_of_rows_with_empty_message = summary.count_of_rows_with_empty_message
         if 1 == number_of_rows_with_empty_message:
             errors.append("check you have content for the empty message in 1 row")
         else:
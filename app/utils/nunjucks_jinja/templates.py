@@ -2,6 +2,7 @@ import builtins
 import os.path as path
 import re
 from collections.abc import Sized
+from functools import lru_cache
 
 import jinja2
 import jinja2.ext
@@ -103,6 +104,16 @@ def njk_to_j2(template):
     return template
 
 
+@lru_cache(maxsize=64)
+def cached_njk_to_j2(template):
+    """
+    Like `njk_to_j2`, but only converts each version of a template once.
+    The cache is keyed on the source which was read, so a file which has
+    changed is converted again.
+    """
+    return njk_to_j2(template)
+
+
 def indent_njk(s, width=4, first=False, blank=False, indentfirst=None):
     """Return a copy of the string with each line indented by 4 spaces."""
 
@@ -161,7 +172,7 @@ class NunjucksExtension(jinja2.ext.Extension):
 
     def preprocess(self, source, name, filename=None):
         if filename and filename.endswith(".njk"):
-            return njk_to_j2(source)
+            return cached_njk_to_j2(source)
         else:
             return source
 
@@ -0,0 +1,95 @@
+"""
+Benchmarks for rendering long, link-heavy email bodies as markdown.
+
+Compares rendering a body for the first time, which parses it with
+mistune, with rendering it again, which gets it from `rendered_markdown`.
+Run with:
+
+    poetry run python -m benchmarks.markdown
+"""
+
+import argparse
+import sys
+import time
+
+from notifications_utils.markdown import (
+    notify_email_markdown,
+    notify_plain_text_email_markdown,
+    rendered_markdown,
+)
+
+RENDERERS = {
+    "email": notify_email_markdown,
+    "plain_text_email": notify_plain_text_email_markdown,
+}
+
+PARAGRAPH = (
+    "Your application reference is ABC123. Read more at "
+    "https://www.example.gov/apply/guidance?step={n}#eligibility or "
+    "[contact us](https://www.example.gov/contact) if you need help.\n\n"
+    "* first item https://www.example.gov/documents/{n}.pdf\n"
+    "* second item\n\n"
+)
+
+
+def generate_body(paragraphs):
+    return "# Your application\n\n" + "".join(
+        PARAGRAPH.format(n=n) for n in range(paragraphs)
+    )
+
+
+def measure(render, body, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render(body)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run_benchmarks(renderers=tuple(RENDERERS), paragraphs=(10, 100, 1_000), repeat=3):
+    results = []
+
+    for renderer in renderers:
+        render = RENDERERS[renderer]
+
+        for size in paragraphs:
+            body = generate_body(size)
+            rendered_markdown.clear()
+
+            results.append(
+                {
+                    "renderer": renderer,
+                    "paragraphs": size,
+                    "characters": len(body),
+                    "uncached_seconds": measure(
+                        render.__wrapped__, body, repeat=repeat
+                    ),
+                    "cached_seconds": measure(render, body, repeat=repeat),
+                }
+            )
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--renderers", nargs="+", choices=RENDERERS, default=tuple(RENDERERS)
+    )
+    parser.add_argument("--paragraphs", type=int, nargs="+", default=(10, 100, 1_000))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    for result in run_benchmarks(args.renderers, args.paragraphs, args.repeat):
+        print(
+            "{renderer:>16} {paragraphs:>6} paragraphs {characters:>9,} characters "
+            "uncached {uncached_seconds:8.4f}s "
+            "cached {cached_seconds:8.4f}s".format(**result)
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+"""
+Benchmarks for how `RecipientCSV` scales with the size of the uploaded file.
+
+Generates SMS and email files of 1,000, 10,000 and 100,000 rows (the most
+`RecipientCSV` will accept) and records the wall time and peak memory of
+the things the check pages do with them. Run with:
+
+    poetry run python -m benchmarks.recipient_csv --output results.json
+
+and pass a previous results file as `--baseline` to fail if anything has
+got slower.
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from notifications_utils.recipients import RecipientCSV
+from notifications_utils.template import PlainTextEmailTemplate, SMSMessageTemplate
+
+SIZES = (1_000, 10_000, 100_000)
+
+TEMPLATES = {
+    "sms": lambda: SMSMessageTemplate(
+        {
+            "content": "Hello ((name)), your reference is ((reference))",
+            "template_type": "sms",
+        }
+    ),
+    "email": lambda: PlainTextEmailTemplate(
+        {
+            "content": "Hello ((name)),\n\nYour reference is ((reference))",
+            "subject": "Your reference",
+            "template_type": "email",
+        }
+    ),
+}
+
+RECIPIENTS = {
+    "sms": (("phone number",), lambda n: f"202867{n % 10_000:04}"),
+    "email": (("email address",), lambda n: f"test+{n}@example.com"),
+}
+
+BAD_RECIPIENTS = {
+    "sms": "12345",
+    "email": "not an email address",
+}
+
+OPERATIONS = {
+    "len": len,
+    "has_errors": lambda recipients: recipients.has_errors,
+    "rows_with_errors": lambda recipients: list(recipients.rows_with_errors),
+    "get_row": lambda recipients: recipients.get_row(len(recipients) // 2),
+    "iterate_rows": lambda recipients: [row.recipient for row in recipients],
+}
+
+
+def generate_csv(
+    template_type,
+    number_of_rows,
+    *,
+    error_rate=0.0,
+    duplicate_placeholders=False,
+    extra_columns=0,
+    seed=0,
+):
+    """
+    Make a file of `number_of_rows` recipients for the benchmark templates.
+    Roughly `error_rate` of the rows have either a bad recipient or a
+    missing placeholder.
+    """
+    rng = random.Random(seed)
+    recipient_columns, make_recipient = RECIPIENTS[template_type]
+
+    headers = list(recipient_columns) + ["name", "reference"]
+    if duplicate_placeholders:
+        headers.append("Name")
+    headers.extend(f"extra column {n}" for n in range(extra_columns))
+
+    lines = [",".join(headers)]
+
+    for n in range(number_of_rows):
+        recipient = make_recipient(n)
+        name = f"Name {n}"
+
+        if rng.random() < error_rate:
+            if rng.random() < 0.5:
+                recipient = BAD_RECIPIENTS[template_type]
+            else:
+                name = ""
+
+        row = [recipient, name, f"REF{n:06}"]
+        if duplicate_placeholders:
+            row.append(name)
+        row.extend(f"extra {n}" for _ in range(extra_columns))
+        lines.append(",".join(row))
+
+    return "\n".join(lines)
+
+
+def measure(operation, file_data, template_type, repeat=3):
+    """
+    Time an operation on a new `RecipientCSV` (like a request to the check
+    pages would) then run it again under `tracemalloc` to find its peak
+    memory, so that tracing doesn’t slow down the timed runs.
+    """
+
+    def run():
+        operation(RecipientCSV(file_data, template=TEMPLATES[template_type]()))
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        run()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"seconds": min(timings), "peak_memory_bytes": peak_memory}
+
+
+def run_benchmarks(
+    sizes=SIZES,
+    template_types=tuple(TEMPLATES),
+    operations=tuple(OPERATIONS),
+    repeat=3,
+    **csv_options,
+):
+    results = []
+
+    for template_type in template_types:
+        for size in sizes:
+            file_data = generate_csv(template_type, size, **csv_options)
+
+            for operation in operations:
+                results.append(
+                    {
+                        "template_type": template_type,
+                        "rows": size,
+                        "operation": operation,
+                        **measure(
+                            OPERATIONS[operation],
+                            file_data,
+                            template_type,
+                            repeat=repeat,
+                        ),
+                    }
+                )
+
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "csv_options": csv_options,
+        "results": results,
+    }
+
+
+def find_regressions(baseline, current, tolerance):
+    """
+    Compare two sets of results, returning a description of each operation
+    which has got more than `tolerance` slower or uses more than
+    `tolerance` more memory.
+    """
+
+    def key(result):
+        return result["template_type"], result["rows"], result["operation"]
+
+    baseline_results = {key(result): result for result in baseline["results"]}
+    regressions = []
+
+    for result in current["results"]:
+        previous = baseline_results.get(key(result))
+        if previous is None:
+            continue
+
+        for measurement in ("seconds", "peak_memory_bytes"):
+            if result[measurement] > previous[measurement] * (1 + tolerance):
+                regressions.append(
+                    "{} {} rows {}: {} went from {} to {}".format(
+                        *key(result),
+                        measurement,
+                        previous[measurement],
+                        result[measurement],
+                    )
+                )
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument(
+        "--template-types", nargs="+", choices=TEMPLATES, default=tuple(TEMPLATES)
+    )
+    parser.add_argument(
+        "--operations", nargs="+", choices=OPERATIONS, default=tuple(OPERATIONS)
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--duplicate-placeholders", action="store_true")
+    parser.add_argument("--extra-columns", type=int, default=0)
+    parser.add_argument("--output", help="Where to write the results as JSON")
+    parser.add_argument("--baseline", help="Previous results to compare against")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="How much slower or bigger than the baseline counts as a regression",
+    )
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(
+        sizes=args.sizes,
+        template_types=args.template_types,
+        operations=args.operations,
+        repeat=args.repeat,
+        error_rate=args.error_rate,
+        duplicate_placeholders=args.duplicate_placeholders,
+        extra_columns=args.extra_columns,
+    )
+
+    for result in results["results"]:
+        print(
+            "{template_type:>5} {rows:>7} rows {operation:<16} "
+            "{seconds:8.3f}s {peak_memory_bytes:>12,} bytes".format(**result)
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(json.load(f), results, args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""
+Benchmarks for encoding text with `SanitiseSMS` and `SanitiseASCII`.
+
+Compares `encode`, which translates the text with a table of every
+character seen so far, with encoding each character in turn using
+`encode_char` (which is how `encode` used to work) and checks that both
+give the same result. Run with:
+
+    poetry run python -m benchmarks.sanitise_text
+"""
+
+import argparse
+import sys
+import time
+
+from notifications_utils.sanitise_text import SanitiseASCII, SanitiseSMS
+
+SANITISERS = {
+    "sms": SanitiseSMS,
+    "ascii": SanitiseASCII,
+}
+
+TEXTS = {
+    "gsm": "Hello Alice, your appointment is at 10:30 on 1 May. Reply STOP to opt out. ",
+    "welsh": "Helo Siân, mae’ch apwyntiad am 10:30 ar ddydd Llun – diolch yn fawr. ",
+    "mixed": "Hi 👋 “quoted” text​, Привет, 你好, مرحبا, café… ",
+}
+
+
+def encode_each_character(sanitiser, content):
+    return "".join(sanitiser.encode_char(char) for char in content)
+
+
+def measure(encode, sanitiser, content, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        encode(sanitiser, content)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run_benchmarks(sanitisers=tuple(SANITISERS), texts=tuple(TEXTS), length=100_000):
+    results = []
+
+    for sanitiser_name in sanitisers:
+        sanitiser = SANITISERS[sanitiser_name]
+
+        for text in texts:
+            content = (TEXTS[text] * (length // len(TEXTS[text]) + 1))[:length]
+
+            if sanitiser.encode(content) != encode_each_character(sanitiser, content):
+                raise AssertionError(f"{sanitiser_name} {text}: encodings differ")
+
+            results.append(
+                {
+                    "sanitiser": sanitiser_name,
+                    "text": text,
+                    "characters": length,
+                    "encode_seconds": measure(
+                        lambda sanitiser, content: sanitiser.encode(content),
+                        sanitiser,
+                        content,
+                    ),
+                    "encode_each_character_seconds": measure(
+                        encode_each_character, sanitiser, content
+                    ),
+                }
+            )
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--sanitisers", nargs="+", choices=SANITISERS, default=tuple(SANITISERS)
+    )
+    parser.add_argument("--texts", nargs="+", choices=TEXTS, default=tuple(TEXTS))
+    parser.add_argument("--length", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    for result in run_benchmarks(args.sanitisers, args.texts, args.length):
+        print(
+            "{sanitiser:>5} {text:<5} {characters:>9,} characters "
+            "encode {encode_seconds:8.4f}s "
+            "each character {encode_each_character_seconds:8.4f}s".format(**result)
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -18,6 +18,12 @@ disable_redirect_access_to_syslog = True
 gunicorn.SERVER_SOFTWARE = "None"
 
 
+def post_worker_init(worker):
+    from app import warm_jinja_cache
+
+    warm_jinja_cache(worker.wsgi)
+
+
 def worker_abort(worker):
     worker.log.info("worker received ABORT")
     for stack in sys._current_frames().values():
@@ -2,6 +2,7 @@ import re
 
 SMS_CHAR_COUNT_LIMIT = 918  # 153 * 6, no network issues but check with providers before upping this further
 LETTER_MAX_PAGE_COUNT = 10
+EMAIL_SIZE_LIMIT_IN_BYTES = 2000000  # see BaseEmailTemplate.is_message_too_long
 DAILY_MESSAGE_LIMIT = 10000
 
 # regexes for use in recipients.validate_email_address.
@@ -13,6 +14,7 @@ hostname_part = re.compile(r"^(xn|[a-z0-9]+)(-?-[a-z0-9]+)*$", re.IGNORECASE)
 tld_part = re.compile(r"^([a-z]{2,63}|xn--([a-z0-9]+-)*[a-z0-9]+)$", re.IGNORECASE)
 VALID_LOCAL_CHARS = r"a-zA-Z0-9.!#$%&'*+/=?^_`{|}~\-"
 EMAIL_REGEX_PATTERN = r"^[{}]+@([^.@][^@\s]+)$".format(VALID_LOCAL_CHARS)
+email_regex = re.compile(EMAIL_REGEX_PATTERN)
 email_with_smart_quotes_regex = re.compile(
     # matches wider than an email - everything between an at sign and the nearest whitespace
     r"(^|\s)\S+@\S+(\s|$)",
@@ -1,4 +1,5 @@
 import re
+from functools import cached_property, lru_cache
 
 from markupsafe import Markup
 from ordered_set import OrderedSet
@@ -24,12 +25,12 @@ class Placeholder:
     def is_conditional(self):
         return "??" in self.body
 
-    @property
+    @cached_property
     def name(self):
         # for non conditionals, name equals body
         return self.body.split("??")[0]
 
-    @property
+    @cached_property
     def conditional_text(self):
         if self.is_conditional():
             # ((a?? b??c)) returns " b??c"
@@ -118,8 +119,9 @@ class Field:
         self._values = InsensitiveDict(value) if value else {}
 
     def format_match(self, match):
-        placeholder = Placeholder.from_match(match)
+        return self.format_placeholder(Placeholder.from_match(match))
 
+    def format_placeholder(self, placeholder):
         if self.redact_missing_personalisation:
             return self.placeholder_tag_redacted
 
@@ -131,20 +133,23 @@ class Field:
         return self.placeholder_tag.format(placeholder.name)
 
     def replace_match(self, match):
-        placeholder = Placeholder.from_match(match)
+        return self.replace_placeholder(Placeholder.from_match(match))
+
+    def replace_placeholder(self, placeholder):
         replacement = self.values.get(placeholder.name)
 
         if placeholder.is_conditional() and replacement is not None:
             return placeholder.get_conditional_body(replacement)
 
-        replaced_value = self.get_replacement(placeholder)
+        replaced_value = self.get_replacement(placeholder, replacement)
         if replaced_value is not None:
-            return self.get_replacement(placeholder)
+            return replaced_value
 
-        return self.format_match(match)
+        return self.format_placeholder(placeholder)
 
-    def get_replacement(self, placeholder):
-        replacement = self.values.get(placeholder.name)
+    def get_replacement(self, placeholder, replacement=None):
+        if replacement is None:
+            replacement = self.values.get(placeholder.name)
         if replacement is None:
             return None
 
@@ -166,11 +171,17 @@ class Field:
             return "\n\n" + "\n".join("* {}".format(item) for item in replacement)
         return unescaped_formatted_list(replacement, before_each="", after_each="")
 
+    def _render(self, render_placeholder):
+        segments = compile_field(self.content, self.sanitizer)
+        if len(segments) == 1:
+            return segments[0]
+        parts = list(segments)
+        parts[1::2] = map(render_placeholder, segments[1::2])
+        return "".join(parts)
+
     @property
     def _raw_formatted(self):
-        return re.sub(
-            self.placeholder_pattern, self.format_match, self.sanitizer(self.content)
-        )
+        return self._render(self.format_placeholder)
 
     @property
     def formatted(self):
@@ -187,9 +198,20 @@ class Field:
 
     @property
     def replaced(self):
-        return re.sub(
-            self.placeholder_pattern, self.replace_match, self.sanitizer(self.content)
-        )
+        return self._render(self.replace_placeholder)
+
+
+@lru_cache(maxsize=1024)
+def compile_field(content, sanitizer):
+    """
+    Sanitise `content` and split it on its placeholders, so that a field
+    can be rendered by joining the pieces rather than searching the content
+    each time. Literal text is at the even indexes and a `Placeholder` at
+    each odd one.
+    """
+    segments = Field.placeholder_pattern.split(sanitizer(content))
+    segments[1::2] = map(Placeholder, segments[1::2])
+    return tuple(segments)
 
 
 class PlainTextField(Field):
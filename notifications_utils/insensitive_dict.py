@@ -13,6 +13,8 @@ class InsensitiveDict(dict):
     >>> True
     """
 
+    __slots__ = ()
+
     KEY_TRANSLATION_TABLE = {ord(c): None for c in " _-"}
 
     def __init__(self, row_dict):
@@ -52,7 +54,7 @@ class InsensitiveDict(dict):
         return {key: self.get(key) for key in keys}
 
     @staticmethod
-    @lru_cache(maxsize=32, typed=False)
+    @lru_cache(maxsize=1024, typed=False)
     def make_key(original_key):
         if original_key is None:
             return None
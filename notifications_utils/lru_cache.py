@@ -0,0 +1,59 @@
+import sys
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    A least recently used cache which is bounded by the total size of the
+    values it holds, rather than how many of them there are, so a few very
+    big values can’t use up all the memory.
+
+    It counts hits and misses so it’s possible to tell if it’s working.
+    """
+
+    def __init__(self, max_size_in_bytes, get_size=sys.getsizeof):
+        self.max_size_in_bytes = max_size_in_bytes
+        self.get_size = get_size
+        self._items = OrderedDict()
+        self.size_in_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def get_or_set(self, key, make_value):
+        if key in self._items:
+            self._items.move_to_end(key)
+            self.hits += 1
+            return self._items[key]
+
+        self.misses += 1
+        value = make_value()
+        self.set(key, value)
+        return value
+
+    def set(self, key, value):
+        size = self.get_size(value)
+
+        if key in self._items:
+            self.size_in_bytes -= self.get_size(self._items.pop(key))
+
+        if size > self.max_size_in_bytes:
+            return
+
+        self._items[key] = value
+        self.size_in_bytes += size
+
+        while self.size_in_bytes > self.max_size_in_bytes:
+            _, evicted = self._items.popitem(last=False)
+            self.size_in_bytes -= self.get_size(evicted)
+
+    def clear(self):
+        self._items.clear()
+        self.size_in_bytes = 0
+        self.hits = 0
+        self.misses = 0
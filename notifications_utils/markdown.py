@@ -1,32 +1,53 @@
+import hashlib
 import html
 import re
+from functools import wraps
 
 import mistune
 from flask import current_app
 
 from notifications_utils.formatters import create_sanitised_html_for_url
+from notifications_utils.lru_cache import LRUCache
 
 LINK_STYLE = "word-wrap: break-word; color: #1D70B8;"
 
+plus_list_pattern = re.compile(r"(?m)^(\+)(?=\s)")
+
+# url_pattern = re.compile(r"""(?<!\]\()(?<!["'])\b(https?://[^\s<>()]+)""")
+url_pattern = re.compile(
+    r"""(?<!\]\()
+    (?<!href=["'])
+    \b(https?://[^\s<>"')\]]+)""",
+    re.VERBOSE,
+)
+
+# Rendered markdown, keyed by the renderer and a hash of the text it was
+# given, so the same template body is only parsed once
+rendered_markdown = LRUCache(max_size_in_bytes=16 * 1024 * 1024)
+
+
+def cache_rendered_markdown(render):
+    @wraps(render)
+    def render_or_get_from_cache(text):
+        return rendered_markdown.get_or_set(
+            (render.__name__, hashlib.sha256(text.encode("utf-8")).hexdigest()),
+            lambda: render(text),
+        )
+
+    return render_or_get_from_cache
+
 
 def escape_plus_lists(markdown_text):
-    return re.sub(r"(?m)^(\+)(?=\s)", r"\\\1", markdown_text)
+    return plus_list_pattern.sub(r"\\\1", markdown_text)
 
 
-def autolinkify(text):
-    # url_pattern = re.compile(r"""(?<!\]\()(?<!["'])\b(https?://[^\s<>()]+)""")
-    url_pattern = re.compile(
-        r"""(?<!\]\()
-        (?<!href=["'])
-        \b(https?://[^\s<>"')\]]+)""",
-        re.VERBOSE,
-    )
+def _link_to_url(match):
+    url = match.group(0)
+    return f"[{url}]({url})"
 
-    def replacer(match):
-        url = match.group(0)
-        return f"[{url}]({url})"
 
-    return url_pattern.sub(replacer, text)
+def autolinkify(text):
+    return url_pattern.sub(_link_to_url, text)
 
 
 class EmailRenderer(mistune.HTMLRenderer):
@@ -265,20 +286,32 @@ class LetterPreviewRenderer(mistune.HTMLRenderer):
 _notify_email_markdown = mistune.create_markdown(
     renderer=EmailRenderer(), hard_wrap=True
 )
-notify_letter_preview_markdown = mistune.create_markdown(
+_notify_letter_preview_markdown = mistune.create_markdown(
     renderer=LetterPreviewRenderer()
 )
-notify_email_preheader_markdown = mistune.create_markdown(renderer=PreheaderRenderer())
+_notify_email_preheader_markdown = mistune.create_markdown(renderer=PreheaderRenderer())
 _notify_plain_text_email_markdown = mistune.create_markdown(
     renderer=PlainTextRenderer()
 )
 
 
+@cache_rendered_markdown
 def notify_email_markdown(text):
     text = escape_plus_lists(text)
     return _notify_email_markdown(autolinkify(text))
 
 
+@cache_rendered_markdown
 def notify_plain_text_email_markdown(text):
     text = escape_plus_lists(text)
     return _notify_plain_text_email_markdown(text)
+
+
+@cache_rendered_markdown
+def notify_letter_preview_markdown(text):
+    return _notify_letter_preview_markdown(text)
+
+
+@cache_rendered_markdown
+def notify_email_preheader_markdown(text):
+    return _notify_email_preheader_markdown(text)
@@ -1,10 +1,10 @@
 import csv
-import re
 import sys
+from array import array
 from collections import namedtuple
 from contextlib import suppress
+from copy import copy
 from functools import lru_cache
-from io import StringIO
 from itertools import islice
 
 import phonenumbers
@@ -25,7 +25,13 @@ from notifications_utils.postal_address import (
 )
 from notifications_utils.template import Template
 
-from . import EMAIL_REGEX_PATTERN, hostname_part, tld_part
+from . import (
+    EMAIL_SIZE_LIMIT_IN_BYTES,
+    SMS_CHAR_COUNT_LIMIT,
+    email_regex,
+    hostname_part,
+    tld_part,
+)
 
 us_prefix = "1"
 
@@ -40,6 +46,17 @@ first_column_headings = {
 
 address_columns = InsensitiveDict.from_keys(first_column_headings["letter"])
 
+Column = namedtuple(
+    "Column",
+    [
+        "header",
+        "key",
+        "is_recipient",
+        "is_placeholder",
+        "is_address",
+    ],
+)
+
 
 class RecipientCSV:
     max_rows = 100_000
@@ -69,12 +86,30 @@ class RecipientCSV:
 
     def __len__(self):
         if not hasattr(self, "_len"):
-            self._len = len(self.rows)
+            if self._summary is not None:
+                self._len = self._summary.row_count
+            else:
+                self._len = self.count_rows()
         return self._len
 
     def __getitem__(self, requested_index):
+        if isinstance(requested_index, int):
+            return self.get_row(requested_index)
         return self.rows[requested_index]
 
+    def __iter__(self):
+        return iter(self.rows)
+
+    @property
+    def file_data(self):
+        return self._file_data
+
+    @file_data.setter
+    def file_data(self, value):
+        self._file_data = value
+        self._row_offsets = None
+        self._columns = None
+
     @property
     def guestlist(self):
         return self._guestlist
@@ -85,6 +120,8 @@ class RecipientCSV:
             self._guestlist = list(value)
         except TypeError:
             self._guestlist = []
+        self.guestlist_index = normalise_guestlist(self._guestlist)
+        self._summary = None
 
     @property
     def template(self):
@@ -98,6 +135,7 @@ class RecipientCSV:
                 "notifications_utils.template.Template"
             )
         self._template = value
+        self._summary = None
         self.template_type = self._template.template_type
         self.recipient_column_headers = first_column_headings[self.template_type]
         self.placeholders = self._template.placeholders
@@ -119,6 +157,7 @@ class RecipientCSV:
             InsensitiveDict.make_key(placeholder)
             for placeholder in self.recipient_column_headers
         ]
+        self._columns = None
 
     @property
     def has_errors(self):
@@ -128,18 +167,106 @@ class RecipientCSV:
             or self.more_rows_than_can_send
             or self.too_many_rows
             or (not self.allowed_to_send_to)
-            or any(self.rows_with_errors)
+            or self.summary.count_of_rows_with_errors
         )  # `or` is 3x faster than using `any()` here
 
     @property
     def allowed_to_send_to(self):
-        if self.template_type == "letter":
-            return True
-        if not self.guestlist:
-            return True
-        return all(
-            allowed_to_send_to(row.recipient, self.guestlist) for row in self.rows
+        return self.summary.allowed_to_send_to
+
+    @property
+    def summary(self):
+        if self._summary is None:
+            self._summary = ValidationSummary(self)
+        return self._summary
+
+    @summary.setter
+    def summary(self, value):
+        self._summary = value
+
+    def count_rows(self):
+        """
+        Count the rows in the file without building or validating them.
+        """
+        return len(self.row_offsets)
+
+    @property
+    def row_offsets(self):
+        """
+        Where each row (not counting the header) starts in the file. This
+        takes one pass of the CSV parser, without building or validating
+        any rows, and lets `get_row` read a single row straight from the
+        file.
+        """
+        if self._row_offsets is None:
+            lines = _Lines(self.file_data)
+            rows_as_lists_of_columns = self._read_rows(lines)
+            next(rows_as_lists_of_columns, None)  # skip the header row
+
+            self._row_offsets = array("q")
+            offset = lines.position
+            for _ in rows_as_lists_of_columns:
+                self._row_offsets.append(offset)
+                offset = lines.position
+
+        return self._row_offsets
+
+    def summarise_rows(self, start_index, rows_as_lists_of_columns):
+        columns = self.columns
+        summary = ValidationSummary()
+        for index, row in enumerate(rows_as_lists_of_columns, start=start_index):
+            summary.add_row(self._get_row(index, row, columns), self)
+        return summary
+
+    def summarise_in_chunks(self, chunk_size, map_fn=map):
+        """
+        Validate the file `chunk_size` rows at a time and merge the results
+        into a single summary. `map_fn` is called with a picklable function
+        and the chunks, so it can be the `map` method of a process pool.
+        """
+        limit = self.max_rows
+
+        rows_as_lists_of_columns = self._rows
+
+        next(rows_as_lists_of_columns, None)  # skip the header row
+
+        rows_to_validate = list(islice(rows_as_lists_of_columns, limit))
+        row_count = len(rows_to_validate) + sum(1 for _ in rows_as_lists_of_columns)
+
+        header_only = self._without_rows()
+
+        self.summary = ValidationSummary.merge(
+            map_fn(
+                _summarise_chunk,
+                (
+                    (
+                        header_only,
+                        start,
+                        rows_to_validate[start : start + chunk_size],  # noqa: E203
+                    )
+                    for start in range(0, len(rows_to_validate), chunk_size)
+                ),
+            ),
+            max_initial_rows_shown=self.max_initial_rows_shown,
+            max_errors_shown=self.max_errors_shown,
         )
+        self.summary.row_count = row_count
+        self.summary.stopped_early = row_count > limit
+
+        return self.summary
+
+    def _without_rows(self):
+        # A copy with only the header row, which is cheap to send to
+        # another process along with a chunk of rows
+        lines = _Lines(self.file_data)
+        next(csv.reader(lines, quoting=csv.QUOTE_MINIMAL), None)
+
+        header_only = copy(self)
+        header_only.file_data = self.file_data[: lines.position]
+        header_only.rows_as_list = None
+        header_only.summary = None
+        header_only.__dict__.pop("_len", None)
+        return header_only
 
     @property
     def rows(self):
@@ -149,15 +276,18 @@ class RecipientCSV:
 
     @property
     def _rows(self):
+        return self._read_rows(_Lines(self.file_data))
+
+    @staticmethod
+    def _read_rows(lines):
         return csv.reader(
-            StringIO(self.file_data.strip()),
+            lines,
             quoting=csv.QUOTE_MINIMAL,
             skipinitialspace=True,
         )
 
     def get_rows(self):
-        column_headers = self._raw_column_headers  # this is for caching
-        length_of_column_headers = len(column_headers)
+        columns = self.columns  # this is for caching
 
         rows_as_lists_of_columns = self._rows
 
@@ -168,39 +298,67 @@ class RecipientCSV:
                 yield None
                 continue
 
-            output_dict = {}
+            yield self._get_row(index, row, columns)
 
-            for column_name, column_value in zip(column_headers, row):
-                column_value = strip_and_remove_obscure_whitespace(column_value)
+    def _get_row(self, index, row, columns):
+        number_of_columns = len(columns)
+        output_dict = {}
 
-                if (
-                    InsensitiveDict.make_key(column_name)
-                    in self.recipient_column_headers_as_column_keys
-                ):
-                    output_dict[column_name] = column_value or None
-                else:
-                    insert_or_append_to_dict(
-                        output_dict, column_name, column_value or None
-                    )
+        for column, column_value in zip(columns, row):
+            column_value = strip_and_remove_obscure_whitespace(column_value)
 
-            length_of_row = len(row)
-
-            if length_of_column_headers < length_of_row:
-                output_dict[None] = row[length_of_column_headers:]
-            elif length_of_column_headers > length_of_row:
-                for key in column_headers[length_of_row:]:
-                    insert_or_append_to_dict(output_dict, key, None)
-
-            yield Row(
-                output_dict,
-                index=index,
-                error_fn=self._get_error_for_field,
-                recipient_column_headers=self.recipient_column_headers,
-                placeholders=self.placeholders_as_column_keys,
-                template=self.template,
-                allow_international_letters=self.allow_international_letters,
-                validate_row=self.should_validate,
-            )
+            if column.is_recipient:
+                output_dict[column.header] = column_value or None
+            else:
+                insert_or_append_to_dict(
+                    output_dict, column.header, column_value or None
+                )
+
+        length_of_row = len(row)
+
+        if number_of_columns < length_of_row:
+            output_dict[None] = row[number_of_columns:]
+        elif number_of_columns > length_of_row:
+            for column in columns[length_of_row:]:
+                insert_or_append_to_dict(output_dict, column.header, None)
+
+        return Row(
+            output_dict,
+            index=index,
+            error_fn=self._get_error_for_field,
+            recipient_column_headers=self.recipient_column_headers,
+            placeholders=self.placeholders_as_column_keys,
+            template=self.template,
+            allow_international_letters=self.allow_international_letters,
+            validate_row=self.should_validate,
+            column_keys=self.column_keys,
+        )
+
+    def get_row(self, index):
+        """
+        Build the row at `index` by parsing and validating only that row,
+        rather than every row in the file.
+        """
+        if self.rows_as_list is not None:
+            return self.rows_as_list[index]
+
+        row_offsets = self.row_offsets
+
+        if index < 0:
+            index += len(row_offsets)
+
+        if not 0 <= index < len(row_offsets):
+            raise IndexError(index)
+
+        if index >= self.max_rows:
+            return None
+
+        row = next(
+            self._read_rows(_Lines(self.file_data, start=row_offsets[index])),
+            [],
+        )
+
+        return self._get_row(index, row, self.columns)
 
     @property
     def more_rows_than_can_send(self):
@@ -216,9 +374,9 @@ class RecipientCSV:
 
     @property
     def displayed_rows(self):
-        if any(self.rows_with_errors) and not self.missing_column_headers:
-            return self.initial_rows_with_errors
-        return self.initial_rows
+        if self.summary.count_of_rows_with_errors and not self.missing_column_headers:
+            return iter(self.summary.initial_rows_with_errors)
+        return iter(self.summary.initial_rows)
 
     def _filter_rows(self, attr):
         return (row for row in self.rows if row and getattr(row, attr))
@@ -249,14 +407,55 @@ class RecipientCSV:
 
     @property
     def _raw_column_headers(self):
-        for row in self._rows:
-            return row
-        return []
+        return next(self._rows, [])
 
     @property
     def column_headers(self):
         return list(OrderedSet(self._raw_column_headers))
 
+    @property
+    def columns(self):
+        """
+        What each column in the header row normalises to and what it’s used
+        for, in the order the columns appear. This is worked out once per
+        file, so building rows doesn’t have to normalise every cell’s key.
+        """
+        if self._columns is None:
+            self._index_columns()
+        return self._columns
+
+    @property
+    def columns_by_header(self):
+        if self._columns is None:
+            self._index_columns()
+        return self._columns_by_header
+
+    @property
+    def column_keys(self):
+        if self._columns is None:
+            self._index_columns()
+        return self._column_keys
+
+    def _index_columns(self):
+        self._columns = tuple(
+            self._get_column(header) for header in self._raw_column_headers
+        )
+        self._columns_by_header = {column.header: column for column in self._columns}
+        # Values beyond the last column are stored under `None`
+        self._column_keys = {None: None} | {
+            column.header: column.key for column in self._columns
+        }
+
+    def _get_column(self, header):
+        key = InsensitiveDict.make_key(header)
+        return Column(
+            header=header,
+            key=key,
+            is_recipient=key in self.recipient_column_headers_as_column_keys,
+            is_placeholder=key in self.placeholders_as_column_keys,
+            is_address=self.is_address_column(header),
+        )
+
     @property
     def column_headers_as_column_keys(self):
         return InsensitiveDict.from_keys(self.column_headers).keys()
@@ -329,13 +528,12 @@ class RecipientCSV:
         return False
 
     def _get_error_for_field(self, key, value):  # noqa: C901
-        if self.is_address_column(key):
+        column = self.columns_by_header.get(key) or self._get_column(key)
+
+        if column.is_address:
             return
 
-        if (
-            InsensitiveDict.make_key(key)
-            in self.recipient_column_headers_as_column_keys
-        ):
+        if column.is_recipient:
             if value in [None, ""] or isinstance(value, list):
                 if self.duplicate_recipient_column_headers:
                     return None
@@ -352,16 +550,255 @@ class RecipientCSV:
             except (InvalidEmailError, InvalidPhoneError) as error:
                 return str(error)
 
-        if InsensitiveDict.make_key(key) not in self.placeholders_as_column_keys:
+        if not column.is_placeholder:
             return
 
         if value in [None, ""]:
             return Cell.missing_field_error
 
 
+class ValidationSummary:
+    """
+    Everything the check pages need to know about a `RecipientCSV`, worked
+    out by reading and validating the file once rather than once per
+    property.
+
+    Once there are more than `max_rows` rows the file can’t be sent
+    whatever is in the remaining rows, so they are counted but not
+    validated. Rows past `remaining_messages` are still validated, because
+    the check pages show them and which error page is shown depends on
+    whether they’re on the guest list.
+    """
+
+    # Change this whenever `serialize` changes, so that summaries serialized
+    # by an older version of the code aren’t read
+    serialized_version = 1
+
+    def __init__(self, recipients=None):
+        self.row_count = 0
+        self.count_of_rows_with_errors = 0
+        self.count_of_rows_with_bad_recipients = 0
+        self.count_of_rows_with_missing_data = 0
+        self.count_of_rows_with_message_too_long = 0
+        self.count_of_rows_with_empty_message = 0
+        self.initial_rows = []
+        self.initial_rows_with_errors = []
+        self.recipients = set()
+        self.allowed_to_send_to = True
+        self.disallowed_recipients = []
+        self.stopped_early = False
+
+        if recipients is not None:
+            self._summarise(recipients)
+
+    @classmethod
+    def merge(cls, summaries, *, max_initial_rows_shown, max_errors_shown):
+        """
+        Combine the summaries of consecutive chunks of the same file, in
+        the order they appear in the file.
+        """
+        merged = cls()
+
+        for summary in summaries:
+            merged.row_count += summary.row_count
+            merged.count_of_rows_with_errors += summary.count_of_rows_with_errors
+            merged.count_of_rows_with_bad_recipients += (
+                summary.count_of_rows_with_bad_recipients
+            )
+            merged.count_of_rows_with_missing_data += (
+                summary.count_of_rows_with_missing_data
+            )
+            merged.count_of_rows_with_message_too_long += (
+                summary.count_of_rows_with_message_too_long
+            )
+            merged.count_of_rows_with_empty_message += (
+                summary.count_of_rows_with_empty_message
+            )
+            merged.initial_rows.extend(
+                summary.initial_rows[
+                    : max(max_initial_rows_shown - len(merged.initial_rows), 0)
+                ]
+            )
+            merged.initial_rows_with_errors.extend(
+                summary.initial_rows_with_errors[
+                    : max(max_errors_shown - len(merged.initial_rows_with_errors), 0)
+                ]
+            )
+            merged.recipients |= summary.recipients
+            merged.allowed_to_send_to &= summary.allowed_to_send_to
+            merged.disallowed_recipients.extend(
+                summary.disallowed_recipients[
+                    : max(max_errors_shown - len(merged.disallowed_recipients), 0)
+                ]
+            )
+            merged.stopped_early |= summary.stopped_early
+
+        return merged
+
+    def serialize(self):
+        """
+        The summary as JSON-serializable values. Rows are kept as their
+        indexes, and the recipients seen while validating aren’t kept.
+        """
+        return {
+            "row_count": self.row_count,
+            "count_of_rows_with_errors": self.count_of_rows_with_errors,
+            "count_of_rows_with_bad_recipients": self.count_of_rows_with_bad_recipients,
+            "count_of_rows_with_missing_data": self.count_of_rows_with_missing_data,
+            "count_of_rows_with_message_too_long": (
+                self.count_of_rows_with_message_too_long
+            ),
+            "count_of_rows_with_empty_message": self.count_of_rows_with_empty_message,
+            "initial_rows": [row.index for row in self.initial_rows],
+            "initial_rows_with_errors": [
+                row.index for row in self.initial_rows_with_errors
+            ],
+            "allowed_to_send_to": self.allowed_to_send_to,
+            "disallowed_recipients": self.disallowed_recipients,
+            "stopped_early": self.stopped_early,
+        }
+
+    @classmethod
+    def from_serialized(cls, serialized, recipients):
+        """
+        Rebuild a summary from the output of `serialize`, reading its rows
+        from `recipients`, which must be the file it was a summary of.
+        """
+        summary = cls()
+        summary.row_count = serialized["row_count"]
+        summary.count_of_rows_with_errors = serialized["count_of_rows_with_errors"]
+        summary.count_of_rows_with_bad_recipients = serialized[
+            "count_of_rows_with_bad_recipients"
+        ]
+        summary.count_of_rows_with_missing_data = serialized[
+            "count_of_rows_with_missing_data"
+        ]
+        summary.count_of_rows_with_message_too_long = serialized[
+            "count_of_rows_with_message_too_long"
+        ]
+        summary.count_of_rows_with_empty_message = serialized[
+            "count_of_rows_with_empty_message"
+        ]
+        summary.initial_rows = [
+            recipients.get_row(index) for index in serialized["initial_rows"]
+        ]
+        summary.initial_rows_with_errors = [
+            recipients.get_row(index)
+            for index in serialized["initial_rows_with_errors"]
+        ]
+        summary.allowed_to_send_to = serialized["allowed_to_send_to"]
+        summary.disallowed_recipients = serialized["disallowed_recipients"]
+        summary.stopped_early = serialized["stopped_early"]
+        return summary
+
+    def _summarise(self, recipients):
+        columns = recipients.columns
+        limit = recipients.max_rows
+
+        rows_as_lists_of_columns = recipients._rows
+
+        next(rows_as_lists_of_columns, None)  # skip the header row
+
+        for index, row_as_list in enumerate(rows_as_lists_of_columns):
+            if index >= limit:
+                self.stopped_early = True
+                self.row_count = index + 1 + sum(1 for _ in rows_as_lists_of_columns)
+                return
+
+            self.add_row(recipients._get_row(index, row_as_list, columns), recipients)
+
+    def add_row(self, row, recipients):
+        self.row_count += 1
+
+        if len(self.initial_rows) < recipients.max_initial_rows_shown:
+            self.initial_rows.append(row)
+
+        if recipients.should_validate:
+            self._count_errors(row, recipients.max_errors_shown)
+
+        recipient = row.recipient
+        if isinstance(recipient, str):
+            self.recipients.add(recipient)
+
+        if (
+            recipients.template_type != "letter"
+            and recipients.guestlist_index
+            and (
+                self.allowed_to_send_to
+                or len(self.disallowed_recipients) < recipients.max_errors_shown
+            )
+            and format_recipient(recipient) not in recipients.guestlist_index
+        ):
+            self.allowed_to_send_to = False
+            if len(self.disallowed_recipients) < recipients.max_errors_shown:
+                self.disallowed_recipients.append(recipient)
+
+    def _count_errors(self, row, max_errors_shown):
+        if row.has_error:
+            self.count_of_rows_with_errors += 1
+            if len(self.initial_rows_with_errors) < max_errors_shown:
+                self.initial_rows_with_errors.append(row)
+        if row.has_bad_recipient:
+            self.count_of_rows_with_bad_recipients += 1
+        if row.has_missing_data:
+            self.count_of_rows_with_missing_data += 1
+        if row.message_too_long:
+            self.count_of_rows_with_message_too_long += 1
+        if row.message_empty:
+            self.count_of_rows_with_empty_message += 1
+
+
+class _Lines:
+    """
+    Iterates over the lines of a string from `start`, keeping track of
+    where it has got to. The CSV parser reads from this rather than a
+    `StringIO`, so reading the header or a single row doesn’t copy the
+    whole file first.
+    """
+
+    def __init__(self, text, start=0):
+        self.text = text
+        self.position = start
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        start = self.position
+        end = self.text.find("\n", start) + 1
+
+        if not end:
+            if start >= len(self.text):
+                raise StopIteration
+            end = len(self.text)
+
+        self.position = end
+        return self.text[start:end]
+
+
+def _summarise_chunk(chunk):
+    # Module-level so that it can be pickled and run in another process
+    recipients, start_index, rows_as_lists_of_columns = chunk
+    return recipients.summarise_rows(start_index, rows_as_lists_of_columns)
+
+
 class Row(InsensitiveDict):
-    message_too_long = False
-    message_empty = False
+    """
+    A row stores the raw value of each cell and a map of only the cells
+    which have errors. `Cell`s are built when a value is looked up, so a
+    big file doesn’t hold an object for every one of its cells.
+    """
+
+    __slots__ = (
+        "index",
+        "recipient_column_headers",
+        "placeholders",
+        "allow_international_letters",
+        "template_type",
+        "message_too_long",
+        "message_empty",
+        "errors",
+    )
 
     def __init__(
         self,
@@ -374,10 +811,11 @@ class Row(InsensitiveDict):
         template,
         allow_international_letters,
         validate_row=True,
+        column_keys=None,
     ):
         # If we don't need to validate, then:
         # by not setting template we avoid the template level validation (used to check message length)
-        # by not setting error_fn, we avoid the Cell.__init__ validation (used to check phone nums are valid,
+        # by not setting error_fn, we avoid the cell level validation (used to check phone nums are valid,
         # placeholders are present, etc)
         if not validate_row:
             template = None
@@ -387,37 +825,82 @@ class Row(InsensitiveDict):
         self.recipient_column_headers = recipient_column_headers
         self.placeholders = placeholders
         self.allow_international_letters = allow_international_letters
+        self.template_type = None
+        self.message_too_long = False
+        self.message_empty = False
+        self.errors = None
+
+        # `column_keys` maps each of the file’s column headers to its
+        # normalised key, so it doesn’t have to be worked out for each cell
+        make_key = column_keys.__getitem__ if column_keys else self.make_key
+
+        for key, value in row_dict.items():
+            dict.__setitem__(self, make_key(key), value)
 
         if template:
-            template.values = row_dict
             self.template_type = template.template_type
-            # we do not validate email size for CSVs to avoid performance issues
-            if self.template_type == "email":
-                self.message_too_long = False
+            if self.template_type == "sms":
+                # Works out the length from the row’s values, usually
+                # without rendering the message
+                content_count = template.content_count_without_prefix_for(self)
+                self.message_too_long = content_count > SMS_CHAR_COUNT_LIMIT
+                self.message_empty = content_count == 0
+            elif self.template_type == "email":
+                # Likewise works out the size from the row’s values
+                content_size = template.content_size_in_bytes_for(self)
+                self.message_too_long = content_size > EMAIL_SIZE_LIMIT_IN_BYTES
+                self.message_empty = content_size == 0
             else:
+                template.values = row_dict
                 self.message_too_long = template.is_message_too_long()
-            self.message_empty = template.is_message_empty()
-
-        super().__init__(
-            {
-                key: Cell(key, value, error_fn, self.placeholders)
-                for key, value in row_dict.items()
-            }
-        )
+                self.message_empty = template.is_message_empty()
+
+        if error_fn:
+            for key, value in row_dict.items():
+                # Keys which normalise to the same thing overwrite each
+                # other, so their errors have to as well
+                if error := error_fn(key, value):
+                    if self.errors is None:
+                        self.errors = {}
+                    self.errors[make_key(key)] = error
+                elif self.errors:
+                    self.errors.pop(make_key(key), None)
 
     def __getitem__(self, key):
-        return super().__getitem__(key) if key in self else Cell()
+        return self._get_cell(self.make_key(key)) if key in self else Cell()
 
     def get(self, key, default=None):
         if key not in self and default is not None:
             return default
         return self[key]
 
+    def values(self):
+        return [self._get_cell(key) for key in dict.keys(self)]
+
+    def items(self):
+        return [(key, self._get_cell(key)) for key in dict.keys(self)]
+
+    def __reduce__(self):
+        # Pickle the raw values, not the `Cell`s which `items` returns, so
+        # rows can be sent back from a process pool
+        return (
+            self.__class__.__new__,
+            (self.__class__,),
+            (None, {slot: getattr(self, slot) for slot in self.__slots__}),
+            None,
+            iter(dict.items(self)),
+        )
+
+    def _get_cell(self, key):
+        return Cell.from_row(
+            dict.__getitem__(self, key),
+            self.errors.get(key) if self.errors else None,
+            key not in self.placeholders,
+        )
+
     @property
     def has_error(self):
-        return self.has_error_spanning_multiple_cells or any(
-            cell.error for cell in self.values()
-        )
+        return self.has_error_spanning_multiple_cells or bool(self.errors)
 
     @property
     def has_bad_recipient(self):
@@ -437,7 +920,7 @@ class Row(InsensitiveDict):
 
     @property
     def has_missing_data(self):
-        return any(cell.error == Cell.missing_field_error for cell in self.values())
+        return bool(self.errors) and Cell.missing_field_error in self.errors.values()
 
     @property
     def recipient(self):
@@ -456,15 +939,17 @@ class Row(InsensitiveDict):
     @property
     def personalisation(self):
         return InsensitiveDict(
-            {key: cell.data for key, cell in self.items() if key in self.placeholders}
+            {key: value for key, value in dict.items(self) if key in self.placeholders}
         )
 
     @property
     def recipient_and_personalisation(self):
-        return InsensitiveDict({key: cell.data for key, cell in self.items()})
+        return InsensitiveDict(dict(dict.items(self)))
 
 
 class Cell:
+    __slots__ = ("data", "error", "ignore")
+
     missing_field_error = "Missing"
 
     def __init__(self, key=None, value=None, error_fn=None, placeholders=None):
@@ -472,6 +957,14 @@ class Cell:
         self.error = error_fn(key, value) if error_fn else None
         self.ignore = InsensitiveDict.make_key(key) not in (placeholders or [])
 
+    @classmethod
+    def from_row(cls, data, error, ignore):
+        cell = cls.__new__(cls)
+        cell.data = data
+        cell.error = error
+        cell.ignore = ignore
+        return cell
+
     def __eq__(self, other):
         if not other.__class__ == self.__class__:
             return False
@@ -503,15 +996,12 @@ class InvalidAddressError(InvalidEmailError):
 
 def normalize_phone_number(phonenumber):
     if isinstance(phonenumber, str):
-        phonenumber = phonenumbers.parse(phonenumber, "US")
+        phonenumber = get_parsed_phone_number(phonenumber).parse("US")
     return phonenumbers.format_number(phonenumber, phonenumbers.PhoneNumberFormat.E164)
 
 
 def is_us_phone_number(number):
-    try:
-        return _get_country_code(number) == us_prefix
-    except NumberParseException:
-        return False
+    return get_parsed_phone_number(number).is_us_phone_number
 
 
 international_phone_info = namedtuple(
@@ -560,14 +1050,111 @@ _NANP_COUNTRY_AREA_CODES = [
 ]
 
 
+class ParsedPhoneNumber:
+    """
+    A phone number which is parsed at most once per region, and validated
+    at most once each for US-only and international sending, however many
+    times it’s validated, formatted or looked up.
+
+    Errors are kept as messages rather than exceptions, so that a cached
+    number doesn’t hold on to the traceback of the first time it failed.
+    """
+
+    def __init__(self, number):
+        self.number = number
+        self._parsed = {}
+        self._validated = {}
+
+    def parse(self, region):
+        if region not in self._parsed:
+            try:
+                self._parsed[region] = phonenumbers.parse(self.number, region)
+            except NumberParseException as exc:
+                self._parsed[region] = (exc.error_type, exc._msg)
+
+        parsed = self._parsed[region]
+        if isinstance(parsed, tuple):
+            raise NumberParseException(*parsed)
+        return parsed
+
+    @property
+    def country_code(self):
+        parsed = self.parse("US")
+        country_code = str(parsed.country_code)
+        if country_code == us_prefix:
+            area_code = str(parsed.national_number)[:3]
+            if area_code in _NANP_COUNTRY_AREA_CODES:
+                return f"{country_code}{area_code}"
+        return country_code
+
+    @property
+    def is_us_phone_number(self):
+        try:
+            return self.country_code == us_prefix
+        except NumberParseException:
+            return False
+
+    def validate(self, international=False):
+        international = bool(international)
+
+        if international not in self._validated:
+            try:
+                self._validated[international] = self._validate(international)
+            except InvalidPhoneError as exc:
+                self._validated[international] = exc.args
+                raise
+
+        validated = self._validated[international]
+        if isinstance(validated, tuple):
+            raise InvalidPhoneError(*validated)
+        return validated
+
+    def _validate(self, international):
+        if (not international) or self.is_us_phone_number:
+            return self._validate_us()
+
+        try:
+            parsed = self.parse(None)
+        except NumberParseException as exc:
+            if exc._msg == "Could not interpret numbers after plus-sign.":
+                raise InvalidPhoneError("Not a valid country prefix") from exc
+            raise InvalidPhoneError(exc._msg) from exc
+
+        number = f"{parsed.country_code}{parsed.national_number}"
+        if len(number) < 8:
+            raise InvalidPhoneError("Not enough digits")
+        if len(number) > 15:
+            raise InvalidPhoneError("Too many digits")
+        return normalize_phone_number(parsed)
+
+    def _validate_us(self):
+        try:
+            parsed = self.parse("US")
+        except NumberParseException as exc:
+            raise InvalidPhoneError(exc._msg) from exc
+
+        if not self.is_us_phone_number:
+            raise InvalidPhoneError("Not a US number")
+        if phonenumbers.is_valid_number(parsed):
+            return normalize_phone_number(parsed)
+        if len(str(parsed.national_number)) > 10:
+            raise InvalidPhoneError("Too many digits")
+        if len(str(parsed.national_number)) < 10:
+            raise InvalidPhoneError("Not enough digits")
+        if phonenumbers.is_possible_number(parsed):
+            raise InvalidPhoneError("Phone number range is not in use")
+        raise InvalidPhoneError("Phone number is not possible")
+
+
+@lru_cache(maxsize=4096)
+def get_parsed_phone_number(number):
+    # The same numbers turn up again and again in uploads, so keep the
+    # most recently seen ones rather than parsing them each time
+    return ParsedPhoneNumber(number)
+
+
 def _get_country_code(number):
-    parsed = phonenumbers.parse(number, "US")
-    country_code = str(parsed.country_code)
-    if country_code == us_prefix:
-        area_code = str(parsed.national_number)[:3]
-        if area_code in _NANP_COUNTRY_AREA_CODES:
-            return f"{country_code}{area_code}"
-    return country_code
+    return get_parsed_phone_number(number).country_code
 
 
 def get_billable_units_for_prefix(prefix):
@@ -585,39 +1172,11 @@ def use_numeric_sender(number):
 
 
 def validate_us_phone_number(number):
-    try:
-        parsed = phonenumbers.parse(number, "US")
-        if not is_us_phone_number(number):
-            raise InvalidPhoneError("Not a US number")
-        if phonenumbers.is_valid_number(parsed):
-            return normalize_phone_number(parsed)
-        if len(str(parsed.national_number)) > 10:
-            raise InvalidPhoneError("Too many digits")
-        if len(str(parsed.national_number)) < 10:
-            raise InvalidPhoneError("Not enough digits")
-        if phonenumbers.is_possible_number(parsed):
-            raise InvalidPhoneError("Phone number range is not in use")
-        raise InvalidPhoneError("Phone number is not possible")
-    except NumberParseException as exc:
-        raise InvalidPhoneError(exc._msg) from exc
+    return get_parsed_phone_number(number).validate(international=False)
 
 
 def validate_phone_number(number, international=False):
-    if (not international) or is_us_phone_number(number):
-        return validate_us_phone_number(number)
-
-    try:
-        parsed = phonenumbers.parse(number, None)
-        number = f"{parsed.country_code}{parsed.national_number}"
-        if len(number) < 8:
-            raise InvalidPhoneError("Not enough digits")
-        if len(number) > 15:
-            raise InvalidPhoneError("Too many digits")
-        return normalize_phone_number(parsed)
-    except NumberParseException as exc:
-        if exc._msg == "Could not interpret numbers after plus-sign.":
-            raise InvalidPhoneError("Not a valid country prefix") from exc
-        raise InvalidPhoneError(exc._msg) from exc
+    return get_parsed_phone_number(number).validate(international=international)
 
 
 validate_and_format_phone_number = validate_phone_number
@@ -649,38 +1208,58 @@ def _do_simple_email_checks(match, email_address):
         raise InvalidEmailError
 
 
-def validate_email_address(email_address):  # noqa (C901 too complex)
+def validate_email_address(email_address):
     # almost exactly the same as by https://github.com/wtforms/wtforms/blob/master/wtforms/validators.py,
     # with minor tweaks for SES compatibility - to avoid complications we are a lot stricter with the local part
     # than necessary - we don't allow any double quotes or semicolons to prevent SES Technical Failures
     email_address = strip_and_remove_obscure_whitespace(email_address)
-    match = re.match(EMAIL_REGEX_PATTERN, email_address)
+    match = email_regex.match(email_address)
 
     _do_simple_email_checks(match, email_address)
 
-    hostname = match.group(1)
+    if not _is_valid_hostname(match.group(1)):
+        raise InvalidEmailError
+
+    return email_address
+
+
+def validate_email_addresses(email_addresses):
+    """
+    Validate many email addresses at once, returning each one stripped of
+    whitespace if it’s valid or `None` if it isn’t.
+    """
+    validated = []
+    for email_address in email_addresses:
+        try:
+            validated.append(validate_email_address(email_address))
+        except InvalidEmailError:
+            validated.append(None)
+    return validated
+
+
+@lru_cache(maxsize=1024)
+def _is_valid_hostname(hostname):
+    # Uploads tend to have lots of addresses at the same few domains, so
+    # only work out whether each domain is valid once
 
     # idna = "Internationalized domain name" - this encode/decode cycle converts unicode into its accurate ascii
     # representation as the web uses. '例え.テスト'.encode('idna') == b'xn--r8jz45g.xn--zckzah'
     try:
         hostname = hostname.encode("idna").decode("ascii")
     except UnicodeError:
-        raise InvalidEmailError
+        return False
 
     parts = hostname.split(".")
 
     if len(hostname) > 253 or len(parts) < 2:
-        raise InvalidEmailError
+        return False
 
     for part in parts:
         if not part or len(part) > 63 or not hostname_part.match(part):
-            raise InvalidEmailError
+            return False
 
     # if the part after the last . is not a valid TLD then bail out
-    if not tld_part.match(parts[-1]):
-        raise InvalidEmailError
-
-    return email_address
+    return bool(tld_part.match(parts[-1]))
 
 
 def format_email_address(email_address):
@@ -711,7 +1290,7 @@ def format_phone_number_human_readable(phone_number):
     international_phone_info = get_international_phone_info(phone_number)
 
     return phonenumbers.format_number(
-        phonenumbers.parse(phone_number, None),
+        get_parsed_phone_number(phone_number).parse(None),
         (
             phonenumbers.PhoneNumberFormat.INTERNATIONAL
             if international_phone_info.international
@@ -720,8 +1299,17 @@ def format_phone_number_human_readable(phone_number):
     )
 
 
+def normalise_guestlist(guestlist):
+    """
+    Format every phone number (as E.164) and email address (in lowercase)
+    in a guest list once, so that each recipient can be checked against it
+    with a single set lookup.
+    """
+    return frozenset(format_recipient(recipient) for recipient in guestlist)
+
+
 def allowed_to_send_to(recipient, allowlist):
-    return format_recipient(recipient) in {format_recipient(x) for x in allowlist}
+    return format_recipient(recipient) in normalise_guestlist(allowlist)
 
 
 def insert_or_append_to_dict(dict_, key, value):
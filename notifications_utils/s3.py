@@ -3,6 +3,8 @@ import urllib
 
 import botocore
 from boto3 import Session
+from boto3.exceptions import S3UploadFailedError
+from boto3.s3.transfer import TransferConfig
 from botocore.config import Config
 from flask import current_app
 
@@ -69,8 +71,18 @@ def s3upload(
         metadata = put_args["Metadata"] = metadata
 
     try:
-        key.put(**put_args)
-    except botocore.exceptions.ClientError as e:
+        if hasattr(filedata, "read"):
+            # Upload file-like objects in parts as they’re read, rather than
+            # reading the whole thing into memory. Without threads only one
+            # part is held in memory at a time.
+            key.upload_fileobj(
+                put_args.pop("Body"),
+                ExtraArgs=put_args,
+                Config=TransferConfig(use_threads=False),
+            )
+        else:
+            key.put(**put_args)
+    except (botocore.exceptions.ClientError, S3UploadFailedError) as e:
         current_app.logger.error(
             "Unable to upload file to S3 bucket {}".format(bucket_name)
         )
@@ -4,6 +4,31 @@ import unicodedata
 from regex import regex
 
 
+class EncodingTable(dict):
+    """
+    Maps code points to what `encode_char` returns for them, for use with
+    `str.translate`. Each character is looked up with `encode_char` the
+    first time it’s seen, then stored, because working out if a character
+    is from an extended language takes dozens of regular expressions.
+
+    Once `max_size` characters are stored, any others are looked up every
+    time instead, so that text made of unusual characters can’t grow the
+    table towards the million or so code points there are.
+    """
+
+    max_size = 10_000
+
+    def __init__(self, encode_char, allowed_characters):
+        super().__init__((ord(char), char) for char in allowed_characters)
+        self.encode_char = encode_char
+
+    def __missing__(self, code_point):
+        encoded = self.encode_char(chr(code_point))
+        if len(self) < self.max_size:
+            self[code_point] = encoded
+        return encoded
+
+
 class SanitiseText:
     ALLOWED_CHARACTERS = set()
 
@@ -25,9 +50,18 @@ class SanitiseText:
         "\t": " ",  # TAB
     }
 
+    @classmethod
+    def get_encoding_table(cls):
+        # Each subclass allows different characters, so needs its own table
+        if "_encoding_table" not in cls.__dict__:
+            cls._encoding_table = EncodingTable(cls.encode_char, cls.ALLOWED_CHARACTERS)
+        return cls._encoding_table
+
     @classmethod
     def encode(cls, content):
-        return "".join(cls.encode_char(char) for char in content)
+        # `str.translate` rather than `content.translate` so that, like
+        # joining the characters, this always returns a `str` (not `Markup`)
+        return str.translate(content, cls.get_encoding_table())
 
     @classmethod
     def get_non_compatible_characters(cls, content):
@@ -36,12 +70,11 @@ class SanitiseText:
 
         This follows the same rules as `cls.encode`, but returns just the characters that encode would replace with `?`
         """
+        encoding_table = cls.get_encoding_table()
+        # No character can be downgraded to `?`, so any other character
+        # which is encoded as one has no compatible replacement
         return set(
-            c
-            for c in content
-            if c not in cls.ALLOWED_CHARACTERS
-            and cls.is_extended_language(c) is False
-            and cls.downgrade_character(c) is None
+            c for c in set(content) if c != "?" and encoding_table[ord(c)] == "?"
         )
 
     @staticmethod
@@ -1,22 +1,27 @@
+import hashlib
 import math
 import re
 from abc import ABC, abstractmethod
+from collections import Counter, namedtuple
 from datetime import datetime
-from functools import lru_cache
+from functools import lru_cache, wraps
 from html import unescape
 from os import path
 
+import numpy
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 from markupsafe import Markup
 
 from notifications_utils import (
+    EMAIL_SIZE_LIMIT_IN_BYTES,
     LETTER_MAX_PAGE_COUNT,
     MAGIC_SEQUENCE,
     SMS_CHAR_COUNT_LIMIT,
 )
 from notifications_utils.countries.data import Postage
-from notifications_utils.field import Field, PlainTextField
+from notifications_utils.field import Field, Placeholder, PlainTextField
 from notifications_utils.formatters import (
+    OBSCURE_ZERO_WIDTH_WHITESPACE,
     add_prefix,
     add_trailing_newline,
     autolink_urls,
@@ -37,6 +42,7 @@ from notifications_utils.formatters import (
     unlink_usgov_escaped,
 )
 from notifications_utils.insensitive_dict import InsensitiveDict
+from notifications_utils.lru_cache import LRUCache
 from notifications_utils.markdown import (
     notify_email_markdown,
     notify_email_preheader_markdown,
@@ -58,6 +64,47 @@ template_env = Environment(
     ),
 )
 
+# Rendered previews of templates without any personalisation, keyed by
+# `get_preview_cache_key`. They’re a few kilobytes each, so this holds
+# about a thousand of them.
+rendered_previews = LRUCache(max_size_in_bytes=4 * 1024 * 1024)
+
+
+def get_preview_cache_key(template, *preview_options):
+    """
+    Identifies a rendered preview by the template version it’s of, the
+    options it was rendered with and a hash of its content. The hash means
+    a template that’s being edited, which has the same id and version as
+    the saved one, is never given the saved one’s preview.
+    """
+    content = repr((template.content, getattr(template, "_subject", None)))
+    return (
+        template.__class__.__name__,
+        template.id,
+        template.get_raw("version"),
+        preview_options,
+        hashlib.sha256(content.encode("utf-8")).hexdigest(),
+    )
+
+
+def cache_rendered_preview(render):
+    @wraps(render)
+    def render_or_get_from_cache(template):
+        # Previews with personalisation show a recipient’s details, so
+        # they’re never kept around for other requests to use
+        if template.values:
+            return render(template)
+        return rendered_previews.get_or_set(
+            template.preview_cache_key, lambda: render(template)
+        )
+
+    return render_or_get_from_cache
+
+
+gsm_characters = re.compile(
+    r'[\sa-zA-Z0-9_@?£!1$"¥#è?¤é%ù&ì\\ò(Ç)*:Ø+;ÄäøÆ,<LÖlöæ\-=ÑñÅß.>ÜüåÉ/§à¡¿\']*'
+)
+
 
 class Template(ABC):
     encoding = "utf-8"
@@ -251,39 +298,58 @@ class BaseSMSTemplate(Template):
         Since we are supporting more or less "all" languages, it doesn't seem like we really want to count chars,
         and that counting bytes should suffice.
         """
+        message_str = self.content_with_placeholders_filled_in
 
-        # check if all chars are in the GSM-7 character set
-        def gsm_check(x):
-            rule = re.compile(
-                r'^[\sa-zA-Z0-9_@?£!1$"¥#è?¤é%ù&ì\\ò(Ç)*:Ø+;ÄäøÆ,<LÖlöæ\-=ÑñÅß.>ÜüåÉ/§à¡¿\']+$'
-            )
-            gsm_match = rule.search(x)
-            if gsm_match is None:
-                return False
-            return True
+        return count_sms_fragments(len(message_str), is_gsm(message_str))
 
-        message_str = self.content_with_placeholders_filled_in
+    @property
+    def content_plan(self):
+        return get_sms_content_plan(self.content, self.prefix)
+
+    def content_count_without_prefix_for(self, values):
+        """
+        What `content_count_without_prefix` would be if the template had
+        these `values`, which must be an `InsensitiveDict` (or subclass).
+        Usually this is worked out without rendering the message or
+        changing the template’s values.
+        """
+        content_count = self.content_plan.content_count(values)
+
+        if content_count is None:
+            self.values = dict(dict.items(values))
+            return self.content_count_without_prefix
 
-        content_len = len(message_str)
+        if self.prefix:
+            return max((content_count - len(self.prefix) - 2), 0)
+        return content_count
 
+    def fragment_count_for(self, values):
+        """
+        What `fragment_count` would be if the template had these `values`
+        (see `content_count_without_prefix_for`).
         """
-        Checks for GSM-7 char set, calculates msg size, and
-        then fragments based on multipart message rules. ASCII
-        was not specifically called out as almost all messages will
-        switch from 7bit GSM to Unicode.
+        fragment_count = self.content_plan.fragment_count(values)
 
-        Calculations are based on https://messente.com/documentation/tools/sms-length-calculator
+        if fragment_count is None:
+            self.values = dict(dict.items(values))
+            return self.fragment_count
+
+        return fragment_count
+
+    def fragment_counts_for(self, rows):
         """
-        if gsm_check(message_str):
-            if content_len <= 160:
-                return math.ceil(content_len / 160)
-            else:
-                return math.ceil(content_len / 153)
-        else:
-            if content_len <= 70:
-                return math.ceil(content_len / 70)
-            else:
-                return math.ceil(content_len / 67)
+        `fragment_count_for` each of `rows` (like the rows of a
+        `RecipientCSV`) worked out together, and the total number of
+        fragments that sending them all would be billed as.
+        """
+        rows = list(rows)
+        fragment_counts = self.content_plan.fragment_counts(rows)
+
+        for index, row in enumerate(rows):
+            if fragment_counts[index] is None:
+                fragment_counts[index] = self.fragment_count_for(row)
+
+        return SMSFragmentCounts(fragment_counts, sum(fragment_counts))
 
     def is_message_too_long(self):
         """
@@ -320,6 +386,193 @@ class SMSMessageTemplate(BaseSMSTemplate):
         return sms_encode(self._get_unsanitised_content())
 
 
+class SMSContentPlan:
+    """
+    The parts of an SMS template’s content which are the same whoever the
+    message is sent to, worked out once so that each message’s length and
+    fragment count can come from the lengths of its placeholder values
+    without rendering it.
+
+    This only works while the values have nothing in them which would be
+    changed by formatting the message – whitespace other than single
+    spaces between words, punctuation which whitespace before gets
+    removed, or part of the magic sequence – so for any other values
+    `None` is returned and the message has to be rendered instead.
+    """
+
+    countable_value = re.compile(
+        "(?:{word} )*{word}".format(
+            word="[^\\s,.{}]+".format(
+                re.escape(OBSCURE_ZERO_WIDTH_WHITESPACE + MAGIC_SEQUENCE)
+            )
+        )
+    )
+
+    def __init__(self, content, prefix):
+        placeholders = [
+            Placeholder(body) for body in Field.placeholder_pattern.findall(content)
+        ]
+        self.can_count = not any(
+            placeholder.is_conditional() for placeholder in placeholders
+        )
+        self.placeholder_counts = Counter(
+            InsensitiveDict.make_key(placeholder.name) for placeholder in placeholders
+        )
+
+        # Rendering with a one character value for each placeholder gives
+        # the length of everything else in the message
+        message = SMSMessageTemplate(
+            {"content": content, "template_type": "sms"},
+            {key: "x" for key in self.placeholder_counts},
+            prefix=prefix,
+        )
+        unsanitised = message._get_unsanitised_content()
+        encoded = sms_encode(unsanitised)
+        self.static_length = len(unsanitised) - len(placeholders)
+        self.static_encoded_length = len(encoded) - len(placeholders)
+        self.static_is_gsm = bool(gsm_characters.fullmatch(encoded))
+
+    def get_values(self, values):
+        if not self.can_count or not values:
+            return None
+
+        counted_values = []
+        for key, count in self.placeholder_counts.items():
+            value = dict.get(values, key)
+            if not isinstance(value, str) or not self.countable_value.fullmatch(value):
+                return None
+            counted_values.append((value, count))
+
+        return counted_values
+
+    def content_count(self, values):
+        counted_values = self.get_values(values)
+        if counted_values is None:
+            return None
+
+        return self.static_length + sum(
+            len(value) * count for value, count in counted_values
+        )
+
+    def fragment_count(self, values):
+        counted_values = self.get_values(values)
+        if counted_values is None:
+            return None
+
+        content_len = self.static_encoded_length
+        all_gsm = self.static_is_gsm
+
+        for value, count in counted_values:
+            encoded = sms_encode(value)
+            content_len += len(encoded) * count
+            all_gsm = all_gsm and bool(gsm_characters.fullmatch(encoded))
+
+        return count_sms_fragments(content_len, all_gsm and content_len > 0)
+
+    def fragment_counts(self, rows):
+        """
+        `fragment_count` for many rows at once, with `None` for any row
+        which can’t be counted from its values.
+
+        The characters of every row’s values go into one array of code
+        points, so each different character only gets encoded once and
+        the rest is done with array operations rather than per message.
+        """
+        rows_values = [self.get_values(row) for row in rows]
+        countable_rows_values = [values for values in rows_values if values is not None]
+
+        content_lens = numpy.full(
+            len(countable_rows_values), self.static_encoded_length
+        )
+        all_gsm = numpy.full(len(countable_rows_values), self.static_is_gsm)
+
+        if countable_rows_values and self.placeholder_counts:
+            values = [
+                value for row_values in countable_rows_values for value, _ in row_values
+            ]
+            code_points = numpy.frombuffer(
+                "".join(values).encode("utf-32-le"), dtype=numpy.uint32
+            )
+            # Every value has at least one character, so each starts
+            # after the one before it
+            value_starts = numpy.cumsum([0] + [len(value) for value in values[:-1]])
+
+            characters, character_indexes = numpy.unique(
+                code_points, return_inverse=True
+            )
+            encoded_lengths, characters_are_gsm = map(
+                numpy.array,
+                zip(*(get_sms_character_class(chr(c)) for c in characters.tolist())),
+            )
+
+            shape = (len(countable_rows_values), len(self.placeholder_counts))
+            value_lens = numpy.add.reduceat(
+                encoded_lengths[character_indexes], value_starts
+            ).reshape(shape)
+            values_are_gsm = numpy.logical_and.reduceat(
+                characters_are_gsm[character_indexes], value_starts
+            ).reshape(shape)
+
+            content_lens += value_lens @ numpy.array(
+                list(self.placeholder_counts.values())
+            )
+            all_gsm &= values_are_gsm.all(axis=1)
+
+        all_gsm &= content_lens > 0
+        characters_per_fragment = numpy.where(
+            content_lens <= numpy.where(all_gsm, 160, 70),
+            numpy.where(all_gsm, 160, 70),
+            numpy.where(all_gsm, 153, 67),
+        )
+        # Rounds up, like `count_sms_fragments`
+        fragment_counts = iter((-(-content_lens // characters_per_fragment)).tolist())
+
+        return [
+            None if values is None else next(fragment_counts) for values in rows_values
+        ]
+
+
+SMSFragmentCounts = namedtuple("SMSFragmentCounts", ["fragment_counts", "total"])
+
+
+@lru_cache(maxsize=128)
+def get_sms_content_plan(content, prefix):
+    return SMSContentPlan(content, prefix)
+
+
+@lru_cache(maxsize=4096)
+def get_sms_character_class(character):
+    # How many characters this one is encoded as, and whether they’re GSM
+    encoded = sms_encode(character)
+    return len(encoded), bool(gsm_characters.fullmatch(encoded))
+
+
+def is_gsm(content):
+    # check if all chars are in the GSM-7 character set
+    return bool(content) and bool(gsm_characters.fullmatch(content))
+
+
+def count_sms_fragments(content_len, is_gsm):
+    """
+    Checks for GSM-7 char set, calculates msg size, and
+    then fragments based on multipart message rules. ASCII
+    was not specifically called out as almost all messages will
+    switch from 7bit GSM to Unicode.
+
+    Calculations are based on https://messente.com/documentation/tools/sms-length-calculator
+    """
+    if is_gsm:
+        if content_len <= 160:
+            return math.ceil(content_len / 160)
+        else:
+            return math.ceil(content_len / 153)
+    else:
+        if content_len <= 70:
+            return math.ceil(content_len / 70)
+        else:
+            return math.ceil(content_len / 67)
+
+
 class SMSBodyPreviewTemplate(BaseSMSTemplate):
     def __init__(
         self,
@@ -367,6 +620,20 @@ class SMSPreviewTemplate(BaseSMSTemplate):
         super().__init__(template, values, prefix, show_prefix, sender)
         self.redact_missing_personalisation = redact_missing_personalisation
 
+    @property
+    def preview_cache_key(self):
+        return get_preview_cache_key(
+            self,
+            self.prefix,
+            self.show_prefix,
+            self.sender,
+            self.show_sender,
+            self.show_recipient,
+            self.downgrade_non_sms_characters,
+            self.redact_missing_personalisation,
+        )
+
+    @cache_rendered_preview
     def __str__(self):
         return Markup(
             self.jinja_template.render(
@@ -528,6 +795,25 @@ class BaseEmailTemplate(SubjectMixin, Template):
     def content_size_in_bytes(self):
         return len(self.content_with_placeholders_filled_in.encode("utf8"))
 
+    @property
+    def content_plan(self):
+        return get_email_content_plan(self.content)
+
+    def content_size_in_bytes_for(self, values):
+        """
+        What `content_size_in_bytes` would be if the template had these
+        `values`, which must be an `InsensitiveDict` (or subclass). Usually
+        this is worked out without filling in the placeholders or changing
+        the template’s values.
+        """
+        content_size = self.content_plan.content_size_in_bytes(values)
+
+        if content_size is None:
+            self.values = dict(dict.items(values))
+            return self.content_size_in_bytes
+
+        return content_size
+
     def is_message_too_long(self):
         """
         SES rejects email messages bigger than 10485760 bytes (just over 10 MB per message (after base64 encoding)):
@@ -559,7 +845,57 @@ class BaseEmailTemplate(SubjectMixin, Template):
 
         EDIT: putting size up to 2MB as email digests were hitting the limit.
         """
-        return self.content_size_in_bytes > 2000000
+        return self.content_size_in_bytes > EMAIL_SIZE_LIMIT_IN_BYTES
+
+
+class EmailContentPlan:
+    """
+    Like `SMSContentPlan`, the size of everything in an email template’s
+    content apart from its placeholders, so that each message’s size can
+    come from the sizes of its values.
+
+    Values which are empty, have whitespace at either end (which might get
+    stripped from the start or end of the message) or aren’t strings
+    return `None`, as does any template with conditional placeholders.
+    """
+
+    def __init__(self, content):
+        placeholders = [
+            Placeholder(body) for body in Field.placeholder_pattern.findall(content)
+        ]
+        self.can_count = not any(
+            placeholder.is_conditional() for placeholder in placeholders
+        )
+        self.placeholder_counts = Counter(
+            InsensitiveDict.make_key(placeholder.name) for placeholder in placeholders
+        )
+
+        # Filling in each placeholder with a one byte value gives the size
+        # of everything else in the message
+        message = PlainTextEmailTemplate(
+            {"content": content, "subject": "", "template_type": "email"},
+            {key: "x" for key in self.placeholder_counts},
+        )
+        self.static_size_in_bytes = message.content_size_in_bytes - len(placeholders)
+
+    def content_size_in_bytes(self, values):
+        if not self.can_count or not values:
+            return None
+
+        content_size = self.static_size_in_bytes
+
+        for key, count in self.placeholder_counts.items():
+            value = dict.get(values, key)
+            if not isinstance(value, str) or not value or value != value.strip():
+                return None
+            content_size += len(value.encode("utf8")) * count
+
+        return content_size
+
+
+@lru_cache(maxsize=128)
+def get_email_content_plan(content):
+    return EmailContentPlan(content)
 
 
 class PlainTextEmailTemplate(BaseEmailTemplate):
@@ -681,6 +1017,18 @@ class EmailPreviewTemplate(BaseEmailTemplate):
         self.reply_to = reply_to
         self.show_recipient = show_recipient
 
+    @property
+    def preview_cache_key(self):
+        return get_preview_cache_key(
+            self,
+            self.from_name,
+            self.from_address,
+            self.reply_to,
+            self.show_recipient,
+            self.redact_missing_personalisation,
+        )
+
+    @cache_rendered_preview
     def __str__(self):
         return Markup(
             self.jinja_template.render(
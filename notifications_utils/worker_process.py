@@ -0,0 +1,38 @@
+"""
+Runs functions sent to it by another process, one at a time. Each call is
+read from stdin as a pickled `(function, args)` tuple and its result is
+written to stdout as a pickled `(succeeded, result or exception)` tuple.
+The process exits once stdin is closed.
+
+Run with `python -m notifications_utils.worker_process`.
+"""
+
+import os
+import pickle
+import sys
+
+
+def main():
+    calls = sys.stdin.buffer
+    results = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    # Anything else written to stdout goes to stderr instead, so that it
+    # can’t get mixed up with the results
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    while True:
+        try:
+            function, args = pickle.load(calls)
+        except EOFError:
+            return
+
+        try:
+            result = (True, function(*args))
+        except Exception as e:
+            result = (False, e)
+
+        pickle.dump(result, results)
+        results.flush()
+
+
+if __name__ == "__main__":
+    main()
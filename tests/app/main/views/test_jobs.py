@@ -6,6 +6,9 @@ from freezegun import freeze_time
 from hypothesis import HealthCheck, given, settings
 from hypothesis import strategies as st
 
+from app.main.views import jobs
+from app.main.views.jobs import add_preview_of_content_to_notifications
+from notifications_utils.template import EmailPreviewTemplate, SMSBodyPreviewTemplate
 from tests import job_json
 from tests.conftest import (
     SERVICE_ONE_ID,
@@ -430,3 +433,74 @@ def test_poll_status_endpoint_does_not_query_notifications_table(
     assert data["pending"] == 150
 
     mock_get_notifications.assert_not_called()
+
+
+def test_add_preview_of_content_to_notifications_makes_one_template_per_version(
+    mocker,
+):
+    sms_template = mocker.patch(
+        "app.main.views.jobs.SMSBodyPreviewTemplate", wraps=SMSBodyPreviewTemplate
+    )
+    email_template = mocker.patch(
+        "app.main.views.jobs.EmailPreviewTemplate", wraps=EmailPreviewTemplate
+    )
+
+    def template(id_, version, type_="sms", **kwargs):
+        return {
+            "id": id_,
+            "version": version,
+            "template_type": type_,
+            "content": "Hello ((name))",
+            "subject": "Hi ((name))",
+            **kwargs,
+        }
+
+    notifications = [
+        {"template": template("1", 1), "personalisation": {"name": "Alice"}},
+        {"template": template("1", 1), "personalisation": {"name": "Bob"}},
+        {"template": template("1", 2), "personalisation": {"name": "Carol"}},
+        {"template": template("2", 1, "email"), "personalisation": {"name": "Dan"}},
+        {"template": template("2", 1, "email"), "personalisation": {"name": "Eve"}},
+        {"template_name": "Hello ((name))", "personalisation": {"name": "Frank"}},
+        {"template_name": "Bye ((name))", "personalisation": {"name": "Grace"}},
+    ]
+
+    assert [
+        notification["preview_of_content"]
+        for notification in add_preview_of_content_to_notifications(notifications)
+    ] == [
+        "Hello Alice",
+        "Hello Bob",
+        "Hello Carol",
+        "Hi Dan",
+        "Hi Eve",
+        "Hello Frank",
+        "Bye Grace",
+    ]
+    assert sms_template.call_count == 4
+    assert email_template.call_count == 1
+
+
+def test_add_preview_of_content_to_notifications_reuses_redacted_previews(mocker):
+    template = {
+        "id": "1",
+        "version": 1,
+        "template_type": "sms",
+        "content": "Hello ((name))",
+        "redact_personalisation": True,
+    }
+    render = mocker.spy(jobs, "render_preview_of_content")
+
+    assert [
+        notification["preview_of_content"]
+        for notification in add_preview_of_content_to_notifications(
+            [
+                {"template": template, "personalisation": {"name": "Alice"}},
+                {"template": template, "personalisation": {"name": "Bob"}},
+            ]
+        )
+    ] == [
+        "Hello <span class='placeholder-redacted'>hidden</span>",
+        "Hello <span class='placeholder-redacted'>hidden</span>",
+    ]
+    assert render.call_count == 1
@@ -1,4 +1,5 @@
 from collections import OrderedDict
+from io import BytesIO
 from pathlib import Path
 
 import pytest
@@ -47,3 +48,68 @@ def test_spreadsheet_checks_for_bad_arguments(args, kwargs):
         str(exception.value)
         == "Spreadsheet must be created from either rows or CSV data"
     )
+
+
+@pytest.mark.parametrize(
+    "filename",
+    [
+        "excel 2007.xlsx",
+        "excel 2007 with macro support.xlsm",
+        "excel_97.xls",
+        "open document spreadsheet.ods",
+        "tab separated.tsv",
+        "newline_unix.csv",
+        "newline_windows.csv",
+    ],
+)
+def test_streamed_csv_lines_match_csv_data(filename):
+    def from_file():
+        with open(Path.cwd() / "tests" / "spreadsheet_files" / filename, "rb") as f:
+            return Spreadsheet.from_file(BytesIO(f.read()), filename=filename)
+
+    assert "\r\n".join(from_file().iter_csv_lines()).strip() == (
+        from_file().as_csv_data.strip()
+    )
+    assert list(from_file().as_streamed_dict["data"])[:2] == [
+        "phone number,name,favourite colour,fruit",
+        "202 946 8050,Pete,Coral,tomato",
+    ]
+
+
+def test_streamed_csv_lines_are_converted_a_row_at_a_time():
+    rows_read = []
+
+    def rows():
+        for row in (["phone number", "name"], ["2028675309", "Jo\nJo"]):
+            rows_read.append(row)
+            yield row
+
+    lines = Spreadsheet.from_rows(rows()).iter_csv_lines()
+
+    assert next(lines) == "phone number,name"
+    assert len(rows_read) == 1
+    assert list(lines) == ['2028675309,"Jo', 'Jo"']
+    assert len(rows_read) == 2
+
+
+def test_csv_lines_are_split_like_normalised_newlines():
+    file_content = "a,b\r\n1,2\r3,4\n\n5,6 7,8".encode("utf-8")
+
+    assert "\r\n".join(Spreadsheet.iter_lines(BytesIO(file_content))) == (
+        Spreadsheet.normalise_newlines(BytesIO(file_content))
+    )
+
+
+def test_streamed_csv_lines_are_counted():
+    spreadsheet = Spreadsheet.from_file(
+        BytesIO("phone number,name\n2028675309,Jo\n2028675301,Al".encode("utf-8")),
+        filename="file.csv",
+    )
+    assert spreadsheet.csv_lines_read == 0
+
+    lines = spreadsheet.iter_csv_lines()
+    next(lines)
+    assert spreadsheet.csv_lines_read == 1
+
+    list(lines)
+    assert spreadsheet.csv_lines_read == 3
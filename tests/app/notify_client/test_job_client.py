@@ -1,7 +1,8 @@
 import uuid
-from unittest.mock import ANY
+from unittest.mock import ANY, call
 
 import pytest
+from freezegun import freeze_time
 
 from app.models.job import Job, PaginatedJobs
 from app.notify_client.job_api_client import JobApiClient
@@ -32,6 +33,101 @@ def test_client_creates_job_data_correctly(mocker, fake_uuid):
     )
 
 
+@freeze_time("2016-01-01 23:00:00")
+def test_client_records_content_hash_of_job_sent_today(mocker, fake_uuid):
+    mocker.patch("app.notify_client.current_user", id="1")
+    mocker.patch("app.notify_client.job_api_client.JobApiClient.post")
+    mock_redis_set = mocker.patch("app.extensions.RedisClient.set")
+
+    JobApiClient().create_job(fake_uuid, "service_id", content_hash="abc123")
+
+    assert mock_redis_set.call_args_list[1:] == [
+        call(
+            "service-service_id-jobs-sent-2016-01-01-abc123",
+            fake_uuid,
+            ex=86400,
+        ),
+        call(
+            f"job-{fake_uuid}-sent-today-cache-key",
+            "service-service_id-jobs-sent-2016-01-01-abc123",
+            ex=86400,
+        ),
+    ]
+
+
+@pytest.mark.parametrize(
+    ("cached_job_id", "expected_result"),
+    [
+        (None, False),
+        (b"job_id", True),
+    ],
+)
+@freeze_time("2016-01-01 23:00:00")
+def test_has_sent_previously(mocker, cached_job_id, expected_result):
+    mocker.patch("app.notify_client.job_api_client.redis_client.active", True)
+    mock_redis_get = mocker.patch(
+        "app.extensions.RedisClient.get", return_value=cached_job_id
+    )
+    mock_get_jobs = mocker.patch(
+        "app.notify_client.job_api_client.JobApiClient.get_jobs"
+    )
+
+    assert (
+        JobApiClient().has_sent_previously(
+            "service_id",
+            "abc123",
+            template_id="template_id",
+            template_version=1,
+            original_file_name="example.csv",
+        )
+        is expected_result
+    )
+    mock_redis_get.assert_called_once_with(
+        "service-service_id-jobs-sent-2016-01-01-abc123"
+    )
+    assert mock_get_jobs.called is False
+
+
+@pytest.mark.parametrize(
+    ("template_version", "original_file_name", "job_status", "expected_result"),
+    [
+        (1, "example.csv", "finished", True),
+        (1, "example.csv", "cancelled", False),
+        (2, "example.csv", "finished", False),
+        (1, "other.csv", "finished", False),
+    ],
+)
+def test_has_sent_previously_without_redis_compares_todays_jobs(
+    mocker, template_version, original_file_name, job_status, expected_result
+):
+    mocker.patch("app.notify_client.job_api_client.redis_client", active=False)
+    mock_get_jobs = mocker.patch(
+        "app.notify_client.job_api_client.JobApiClient.get_jobs",
+        return_value={
+            "data": [
+                {
+                    "template": "template_id",
+                    "template_version": template_version,
+                    "original_file_name": original_file_name,
+                    "job_status": job_status,
+                }
+            ]
+        },
+    )
+
+    assert (
+        JobApiClient().has_sent_previously(
+            "service_id",
+            "abc123",
+            template_id="template_id",
+            template_version=1,
+            original_file_name="example.csv",
+        )
+        is expected_result
+    )
+    mock_get_jobs.assert_called_once_with("service_id", limit_days=0)
+
+
 def test_convert_user_time_to_utc():
     original_time = "2023-12-01T12:00:00"
     utc_time = JobApiClient.convert_user_time_to_utc(original_time)
@@ -334,6 +430,25 @@ def test_cancel_job(mocker):
     )
 
 
+def test_cancel_job_removes_it_from_jobs_sent_today(mocker):
+    mocker.patch("app.notify_client.job_api_client.JobApiClient.post")
+    mocker.patch(
+        "app.extensions.RedisClient.get",
+        return_value=b"service-service_id-jobs-sent-2016-01-01-abc123",
+    )
+    mock_redis_delete = mocker.patch("app.extensions.RedisClient.delete")
+
+    JobApiClient().cancel_job("service_id", "job_id")
+
+    assert (
+        call(
+            "service-service_id-jobs-sent-2016-01-01-abc123",
+            "job-job_id-sent-today-cache-key",
+        )
+        in mock_redis_delete.call_args_list
+    )
+
+
 @pytest.mark.parametrize(
     ("job_data", "expected_cache_value"),
     [
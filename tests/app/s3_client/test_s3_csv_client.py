@@ -1,6 +1,12 @@
 from unittest.mock import Mock
 
-from app.s3_client.s3_csv_client import remove_blank_lines, set_metadata_on_csv_upload
+import pytest
+
+from app.s3_client.s3_csv_client import (
+    LinesReader,
+    remove_blank_lines,
+    set_metadata_on_csv_upload,
+)
 
 
 def test_sets_metadata(client_request, mocker):
@@ -29,3 +35,35 @@ def test_removes_blank_lines():
     }
     file_data = remove_blank_lines(filedata)
     assert file_data == {"data": "variable,phone number\r\ntest,+15555555555"}
+
+
+def test_removes_blank_lines_from_streamed_data():
+    filedata = {
+        "data": iter(["variable,phone number", "", "   ", "tést,+15555555555", ""])
+    }
+    file_data = remove_blank_lines(filedata)
+    assert file_data["data"].read() == (
+        "variable,phone number\r\ntést,+15555555555".encode("utf-8")
+    )
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        " variable , phone number\t\n  test,+15555555555 \n",
+        iter([" variable , phone number\t", "  test,+15555555555 "]),
+    ],
+)
+def test_removes_whitespace_around_lines(data):
+    file_data = remove_blank_lines({"data": data})["data"]
+    if not isinstance(file_data, str):
+        file_data = file_data.read().decode("utf-8")
+    assert file_data == "variable , phone number\r\ntest,+15555555555"
+
+
+def test_lines_reader_reads_in_parts():
+    reader = LinesReader(["abc", "defgh"])
+    assert reader.read(4) == b"abc"
+    assert reader.read(4) == b"\r\nde"
+    assert reader.read(100) == b"fgh"
+    assert reader.read(100) == b""
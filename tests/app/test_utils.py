@@ -1,8 +1,14 @@
+import os
+import stat
+
+import jinja2
 import pytest
 from flask import Flask
 
-from app import create_app
+import app.config
+from app import create_app, warm_jinja_cache
 from app.utils import merge_jsonlike
+from notifications_utils.template import template_env
 
 
 @pytest.mark.parametrize(
@@ -61,3 +67,50 @@ def test_commit_hash():
 
     with app.app_context() as current_app:
         assert current_app.app.config["COMMIT_HASH"] == "-------"
+
+
+def test_no_bytecode_cache_by_default():
+    app = Flask("app")
+    create_app(app)
+
+    assert app.jinja_env.bytecode_cache is None
+
+
+def test_bytecode_cache_defaults_to_a_directory_only_the_app_can_access(
+    monkeypatch,
+):
+    monkeypatch.setattr(app.config.Test, "JINJA_BYTECODE_CACHE", True)
+    monkeypatch.setattr(template_env, "bytecode_cache", None)
+
+    application = Flask("app")
+    create_app(application)
+
+    cache_dir = os.stat(application.jinja_env.bytecode_cache.directory)
+    assert cache_dir.st_uid == os.getuid()
+    assert stat.S_IMODE(cache_dir.st_mode) == 0o700
+
+
+def test_warm_jinja_cache_shares_compiled_templates_between_workers(
+    mocker, monkeypatch, tmp_path
+):
+    monkeypatch.setattr(app.config.Test, "JINJA_BYTECODE_CACHE", True)
+    monkeypatch.setattr(app.config.Test, "JINJA_BYTECODE_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(template_env, "bytecode_cache", None)
+    compile = mocker.spy(jinja2.Environment, "compile")
+
+    first_worker = Flask("app")
+    create_app(first_worker)
+    warm_jinja_cache(first_worker)
+
+    assert first_worker.jinja_env.bytecode_cache.directory == str(tmp_path)
+    assert template_env.bytecode_cache is first_worker.jinja_env.bytecode_cache
+    assert compile.call_count > 100
+    assert len(list(tmp_path.iterdir())) > 100
+
+    compile.reset_mock()
+    second_worker = Flask("app")
+    create_app(second_worker)
+    warm_jinja_cache(second_worker)
+
+    assert compile.call_count == 0
+    assert len(second_worker.jinja_env.cache) > 100
@@ -1,14 +1,30 @@
+import json
+import os
+import pickle
+import subprocess
+import sys
+import textwrap
 from collections import namedtuple
 from csv import DictReader
 from io import StringIO
 
 import pytest
+from redis import Redis, RedisError
 
+from app.s3_client.s3_csv_client import remove_blank_lines
 from app.utils.csv import (
+    ValidationProcessPool,
     convert_report_date_to_preferred_timezone,
     generate_notifications_csv,
     get_errors_for_csv,
+    get_upload_content_hash,
+    get_validation_progress,
+    get_validation_summary_cache_key,
+    summarise_recipients,
+    validate_recipients_in_background,
 )
+from app.utils.templates import get_sample_template
+from notifications_utils.recipients import RecipientCSV
 from tests.conftest import fake_uuid
 
 
@@ -298,13 +314,13 @@ def test_generate_notifications_csv_calls_twice_if_next_link(
     assert mock_get_notifications.mock_calls[1][2]["page"] == 2
 
 
-MockRecipients = namedtuple(
-    "RecipientCSV",
+MockValidationSummary = namedtuple(
+    "ValidationSummary",
     [
-        "rows_with_bad_recipients",
-        "rows_with_missing_data",
-        "rows_with_message_too_long",
-        "rows_with_empty_message",
+        "count_of_rows_with_bad_recipients",
+        "count_of_rows_with_missing_data",
+        "count_of_rows_with_message_too_long",
+        "count_of_rows_with_empty_message",
     ],
 )
 
@@ -370,11 +386,11 @@ def test_get_errors_for_csv(
 ):
     assert (
         get_errors_for_csv(
-            MockRecipients(
-                rows_with_bad_recipients,
-                rows_with_missing_data,
-                rows_with_message_too_long,
-                rows_with_empty_message,
+            MockValidationSummary(
+                len(rows_with_bad_recipients),
+                len(rows_with_missing_data),
+                len(rows_with_message_too_long),
+                len(rows_with_empty_message),
             ),
             template_type,
         )
@@ -427,3 +443,426 @@ def test_convert_report_date_with_explicit_timezone():
 
     altered = convert_report_date_to_preferred_timezone(original, target_timezone="UTC")
     assert altered == "2023-11-16 03:22:18 PM UTC"
+
+
+@pytest.mark.parametrize(
+    ("threshold", "expected_pool_used"),
+    [
+        (10, False),
+        (3, True),
+    ],
+)
+def test_summarise_recipients_uses_process_pool_for_big_files(
+    notify_admin, mocker, threshold, expected_pool_used
+):
+    mock_pool = mocker.Mock(map=mocker.Mock(side_effect=map))
+    mocker.patch("app.utils.csv.get_validation_pool", return_value=mock_pool)
+    mocker.patch.dict(
+        notify_admin.config, {"CSV_VALIDATION_PROCESS_POOL_ROW_THRESHOLD": threshold}
+    )
+    recipients = RecipientCSV(
+        "phone number\n2028675309\n2028675301\n12345",
+        template=get_sample_template("sms"),
+    )
+
+    summary = summarise_recipients(recipients)
+
+    assert mock_pool.map.called is expected_pool_used
+    assert summary.row_count == 3
+    assert summary.count_of_rows_with_bad_recipients == 1
+    assert recipients.summary is summary
+
+
+def test_validation_process_pool_returns_results_in_order_and_raises_errors():
+    pool = ValidationProcessPool(2)
+
+    assert list(pool.map(int, ["1", "2", "3"])) == [1, 2, 3]
+    with pytest.raises(ValueError):
+        list(pool.map(int, ["1", "two"]))
+    assert list(pool.map(len, ["abc"])) == [3]
+    assert len(pool._idle_processes) <= 2
+
+
+def test_validation_process_pool_validates_big_files_under_gevent():
+    # In its own interpreter, so that monkey patching doesn’t affect other
+    # tests. Each chunk’s summary is bigger than a pipe’s buffer, which is
+    # when a `ProcessPoolExecutor` deadlocks under gevent.
+    script = textwrap.dedent("""
+        from gevent import monkey
+
+        monkey.patch_all()
+
+        import gevent
+
+        from app.utils.csv import ValidationProcessPool
+        from app.utils.templates import get_sample_template
+        from notifications_utils.recipients import RecipientCSV
+
+        recipients = RecipientCSV(
+            "phone number\\n"
+            + "".join(f"20286{i:05d}\\n" for i in range(20_000))
+            + "12345",
+            template=get_sample_template("sms"),
+        )
+        validating = gevent.spawn(
+            recipients.summarise_in_chunks,
+            5_000,
+            map_fn=ValidationProcessPool(2).map,
+        )
+        other_request = gevent.spawn(gevent.sleep, 0.01)
+
+        summary = validating.get(timeout=60)
+
+        assert other_request.successful()
+        assert summary.row_count == 20_001
+        assert summary.count_of_rows_with_bad_recipients == 1
+        assert [row.index for row in summary.initial_rows_with_errors] == [20_000]
+        assert len(summary.recipients) == 20_001
+        """)
+
+    result = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, timeout=90
+    )
+
+    assert result.returncode == 0, result.stderr
+
+
+def test_summarise_recipients_stores_summary_in_redis(notify_admin, mocker):
+    mock_redis_get = mocker.patch("app.utils.csv.redis_client.get", return_value=None)
+    mock_redis_set = mocker.patch("app.utils.csv.redis_client.set")
+    recipients = RecipientCSV(
+        "phone number\n2028675309\n12345",
+        template=get_sample_template("sms"),
+    )
+
+    summary = summarise_recipients(recipients, cache_key="some-key")
+
+    mock_redis_get.assert_called_once_with("some-key")
+    mock_redis_set.assert_called_once_with("some-key", mocker.ANY, ex=3600)
+    assert summary.row_count == 2
+    assert json.loads(mock_redis_set.call_args[0][1]) == {
+        "row_count": 2,
+        "count_of_rows_with_errors": 1,
+        "count_of_rows_with_bad_recipients": 1,
+        "count_of_rows_with_missing_data": 0,
+        "count_of_rows_with_message_too_long": 0,
+        "count_of_rows_with_empty_message": 0,
+        "initial_rows": [0, 1],
+        "initial_rows_with_errors": [1],
+        "allowed_to_send_to": True,
+        "disallowed_recipients": [],
+        "stopped_early": False,
+    }
+
+
+def test_summarise_recipients_uses_summary_from_redis(notify_admin, mocker):
+    file_data = "phone number\n" + ("2028675309\n" * 20) + "12345"
+    cached_summary = summarise_recipients(
+        RecipientCSV(file_data, template=get_sample_template("sms"))
+    )
+    mocker.patch(
+        "app.utils.csv.redis_client.get",
+        return_value=json.dumps(cached_summary.serialize()).encode("utf-8"),
+    )
+    mock_redis_set = mocker.patch("app.utils.csv.redis_client.set")
+    recipients = RecipientCSV(file_data, template=get_sample_template("sms"))
+    get_row = mocker.spy(recipients, "_get_row")
+
+    summary = summarise_recipients(recipients, cache_key="some-key")
+
+    assert summary.row_count == 21
+    assert recipients.summary is summary
+    assert recipients.has_errors
+    assert [row.index for row in summary.initial_rows] == list(range(10))
+    assert [row.index for row in summary.initial_rows_with_errors] == [20]
+    assert summary.initial_rows_with_errors[0].has_bad_recipient
+    # Only the rows which are shown are read from the file again
+    assert get_row.call_count == 11
+    assert mock_redis_set.called is False
+
+
+@pytest.mark.parametrize(
+    "cached",
+    [
+        b"not json",
+        # Stored by a version of the app which pickled summaries
+        pickle.dumps({"row_count": 2}),
+        b"{}",
+        b'{"row_count": 2}',
+        # A row which isn’t in the file
+        json.dumps(
+            {
+                "row_count": 2,
+                "count_of_rows_with_errors": 1,
+                "count_of_rows_with_bad_recipients": 1,
+                "count_of_rows_with_missing_data": 0,
+                "count_of_rows_with_message_too_long": 0,
+                "count_of_rows_with_empty_message": 0,
+                "initial_rows": [0, 1],
+                "initial_rows_with_errors": [5],
+                "allowed_to_send_to": True,
+                "disallowed_recipients": [],
+                "stopped_early": False,
+            }
+        ).encode("utf-8"),
+    ],
+)
+def test_summarise_recipients_validates_file_if_summary_in_redis_cant_be_read(
+    notify_admin, mocker, cached
+):
+    mocker.patch("app.utils.csv.redis_client.get", return_value=cached)
+    mock_redis_set = mocker.patch("app.utils.csv.redis_client.set")
+
+    summary = summarise_recipients(
+        RecipientCSV(
+            "phone number\n2028675309\n12345",
+            template=get_sample_template("sms"),
+        ),
+        cache_key="some-key",
+    )
+
+    assert summary.row_count == 2
+    assert summary.count_of_rows_with_bad_recipients == 1
+    mock_redis_set.assert_called_once_with("some-key", mocker.ANY, ex=3600)
+
+
+def test_summarise_recipients_ignores_summary_from_redis_which_stopped_early(
+    notify_admin, mocker
+):
+    too_many_rows = RecipientCSV(
+        "phone number\n2028675309\n12345",
+        template=get_sample_template("sms"),
+    )
+    too_many_rows.max_rows = 1
+    cached_summary = summarise_recipients(too_many_rows)
+    assert cached_summary.stopped_early
+    mocker.patch(
+        "app.utils.csv.redis_client.get",
+        return_value=json.dumps(cached_summary.serialize()).encode("utf-8"),
+    )
+    mock_redis_set = mocker.patch("app.utils.csv.redis_client.set")
+
+    summary = summarise_recipients(
+        RecipientCSV(
+            "phone number\n2028675309\n12345",
+            template=get_sample_template("sms"),
+        ),
+        cache_key="some-key",
+    )
+
+    assert summary.stopped_early is False
+    assert summary.count_of_rows_with_bad_recipients == 1
+    assert mock_redis_set.called is True
+
+
+def test_validation_summary_cache_key_changes_with_template_version_and_options():
+    def get_key(template_version=1, **options):
+        return get_validation_summary_cache_key(
+            "service", "upload", "template", template_version, **options
+        )
+
+    assert get_key(sms_sender=None) == get_key(sms_sender=None)
+    assert get_key().startswith("csv-validation-summary-v1-service-upload-template-1-")
+    assert (
+        len(
+            {
+                get_key(),
+                get_key(template_version=2),
+                get_key(guestlist=["2028675309"]),
+                get_key(sms_sender="GOVUK"),
+            }
+        )
+        == 4
+    )
+
+
+def test_summarise_recipients_records_progress_after_each_chunk(notify_admin, mocker):
+    mock_pool = mocker.Mock(map=mocker.Mock(side_effect=map))
+    mocker.patch("app.utils.csv.get_validation_pool", return_value=mock_pool)
+    mocker.patch.dict(
+        notify_admin.config,
+        {
+            "CSV_VALIDATION_PROCESS_POOL_ROW_THRESHOLD": 1,
+            "CSV_VALIDATION_CHUNK_SIZE": 2,
+        },
+    )
+    mocker.patch("app.utils.csv.redis_client.get", return_value=None)
+    mock_redis_set = mocker.patch("app.utils.csv.redis_client.set")
+    recipients = RecipientCSV(
+        "phone number\n2028675309\n2028675301\n12345",
+        template=get_sample_template("sms"),
+    )
+
+    summary = summarise_recipients(
+        recipients, cache_key="some-key", record_progress=True
+    )
+
+    assert summary.row_count == 3
+    assert mock_redis_set.call_args_list[:2] == [
+        mocker.call("some-key-progress", 2, ex=120),
+        mocker.call("some-key-progress", 3, ex=120),
+    ]
+    mock_redis_set.assert_called_with("some-key", mocker.ANY, ex=3600)
+
+
+def test_validate_recipients_in_background(notify_admin, mocker):
+    mocker.patch("app.utils.csv.redis_client.get", return_value=None)
+    mock_redis_set = mocker.patch("app.utils.csv.redis_client.set")
+    mock_redis_delete = mocker.patch("app.utils.csv.redis_client.delete")
+    recipients = RecipientCSV(
+        "phone number\n2028675309\n12345",
+        template=get_sample_template("sms"),
+    )
+
+    greenlet = validate_recipients_in_background(lambda: recipients, "some-key")
+
+    mock_redis_set.assert_called_once_with("some-key-progress", 0, ex=120)
+
+    greenlet.join()
+
+    assert recipients.summary.count_of_rows_with_bad_recipients == 1
+    mock_redis_set.assert_called_with("some-key", mocker.ANY, ex=3600)
+    mock_redis_delete.assert_called_once_with("some-key-progress")
+
+
+def test_validate_recipients_in_background_logs_errors(notify_admin, mocker):
+    mocker.patch("app.utils.csv.redis_client.set")
+    mock_redis_delete = mocker.patch("app.utils.csv.redis_client.delete")
+    mock_logger = mocker.patch.object(notify_admin.logger, "exception")
+
+    def get_recipients():
+        raise ValueError("Could not download file")
+
+    validate_recipients_in_background(get_recipients, "some-key").join()
+
+    assert mock_logger.called
+    mock_redis_delete.assert_called_once_with("some-key-progress")
+
+
+def test_validate_recipients_in_background_under_gevent_with_redis():
+    # The Redis service the checks run alongside
+    redis_url = "redis://localhost:6379"
+    try:
+        Redis.from_url(redis_url, socket_connect_timeout=1).ping()
+    except RedisError:
+        pytest.skip("Needs a Redis server on localhost")
+
+    # In its own interpreter, so that monkey patching doesn’t affect other
+    # tests. Nothing is mocked: the file is validated in the process pool
+    # and progress and the summary go through Redis.
+    script = textwrap.dedent("""
+        from gevent import monkey
+
+        monkey.patch_all()
+
+        import sys
+        from uuid import uuid4
+
+        import gevent
+        from flask import Flask
+
+        import app.config
+        from app import create_app
+        from app.extensions import redis_client
+        from app.utils.csv import (
+            get_cached_validation_summary,
+            get_validation_progress,
+            validate_recipients_in_background,
+        )
+        from app.utils.templates import get_sample_template
+        from notifications_utils.recipients import RecipientCSV
+
+        app.config.Test.REDIS_URL = sys.argv[1]
+        application = Flask("app")
+        create_app(application)
+
+        with application.app_context():
+            assert redis_client.active
+            cache_key = f"test-validate-in-background-{uuid4()}"
+            recipients = RecipientCSV(
+                "phone number\\n"
+                + "".join(f"20286{i:05d}\\n" for i in range(20_000))
+                + "12345",
+                template=get_sample_template("sms"),
+            )
+
+            validating = validate_recipients_in_background(
+                lambda: recipients, cache_key
+            )
+            progress = []
+            while not validating.dead:
+                progress.append(get_validation_progress(cache_key))
+                gevent.sleep(0.05)
+
+            assert validating.successful()
+            assert progress[0] == 0
+            assert progress == sorted(progress)
+            assert 0 < max(progress) <= 20_001
+            assert get_validation_progress(cache_key) is None
+
+            summary = get_cached_validation_summary(cache_key, recipients)
+            redis_client.delete(cache_key)
+
+            assert summary.row_count == 20_001
+            assert summary.count_of_rows_with_bad_recipients == 1
+            assert [row.index for row in summary.initial_rows_with_errors] == [
+                20_000
+            ]
+        """)
+
+    result = subprocess.run(
+        [sys.executable, "-c", script, redis_url],
+        capture_output=True,
+        text=True,
+        timeout=90,
+        env={**os.environ, "REDIS_ENABLED": "1"},
+    )
+
+    assert result.returncode == 0, result.stderr
+
+
+@pytest.mark.parametrize(
+    ("cached", "expected_progress"),
+    [
+        (None, None),
+        (b"0", 0),
+        (b"5000", 5000),
+    ],
+)
+def test_get_validation_progress(notify_admin, mocker, cached, expected_progress):
+    mock_redis_get = mocker.patch("app.utils.csv.redis_client.get", return_value=cached)
+
+    assert get_validation_progress("some-key") == expected_progress
+    mock_redis_get.assert_called_once_with("some-key-progress")
+
+
+@pytest.mark.parametrize(
+    "file_data",
+    [
+        "phone number\n2028675309",
+        "\nphone number\r\n\r\n2028675309\r\n",
+        " phone number \r\n\t2028675309 ",
+    ],
+)
+def test_upload_content_hash_is_the_same_for_the_same_file_once_uploaded(
+    file_data,
+):
+    uploaded = remove_blank_lines({"data": file_data})["data"]
+
+    assert get_upload_content_hash(uploaded, "template", 1) == (
+        get_upload_content_hash("phone number\r\n2028675309", "template", 1)
+    )
+
+
+def test_upload_content_hash_changes_with_content_or_template():
+    content_hash = get_upload_content_hash("phone number\n2028675309", "template", 1)
+
+    assert content_hash != get_upload_content_hash(
+        "phone number\n2028675301", "template", 1
+    )
+    assert content_hash != get_upload_content_hash(
+        "phone number\n2028675309", "template", 2
+    )
+    assert content_hash != get_upload_content_hash(
+        "phone number\n2028675309", "other template", 1
+    )
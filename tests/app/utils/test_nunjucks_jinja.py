@@ -0,0 +1,34 @@
+import pytest
+
+from app.utils.nunjucks_jinja import templates
+from app.utils.nunjucks_jinja.templates import cached_njk_to_j2, njk_to_j2
+
+TEMPLATE = "{% if params.items.length %}{% elseif x %}{% endif %}"
+
+
+@pytest.fixture(autouse=True)
+def _clear_converted_templates():
+    cached_njk_to_j2.cache_clear()
+    yield
+    cached_njk_to_j2.cache_clear()
+
+
+def test_cached_njk_to_j2_only_converts_each_version_of_a_template_once(mocker):
+    converted = njk_to_j2(TEMPLATE)
+    changed = njk_to_j2(TEMPLATE + " ")
+    convert = mocker.spy(templates, "njk_to_j2")
+
+    assert cached_njk_to_j2(TEMPLATE) == converted
+    assert cached_njk_to_j2(TEMPLATE) == converted
+    assert convert.call_count == 1
+
+    # A file which has changed since it was last read
+    assert cached_njk_to_j2(TEMPLATE + " ") == changed
+    assert convert.call_count == 2
+
+
+def test_cached_njk_to_j2_keeps_a_limited_number_of_templates():
+    for index in range(100):
+        cached_njk_to_j2(f"{TEMPLATE}{index}")
+
+    assert cached_njk_to_j2.cache_info().currsize == 64
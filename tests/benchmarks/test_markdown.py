@@ -0,0 +1,21 @@
+from benchmarks.markdown import generate_body, main, run_benchmarks
+from notifications_utils.markdown import notify_email_markdown
+
+
+def test_generate_body_has_links():
+    assert notify_email_markdown(generate_body(2)).count("<a ") == 6
+
+
+def test_run_benchmarks_measures_uncached_and_cached_renders():
+    results = run_benchmarks(renderers=("email",), paragraphs=(1, 2), repeat=1)
+
+    assert [(result["renderer"], result["paragraphs"]) for result in results] == [
+        ("email", 1),
+        ("email", 2),
+    ]
+    assert all(result["uncached_seconds"] > 0 for result in results)
+    assert all(result["cached_seconds"] > 0 for result in results)
+
+
+def test_main():
+    assert main(["--paragraphs", "1", "--repeat", "1"]) == 0
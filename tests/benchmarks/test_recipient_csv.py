@@ -0,0 +1,102 @@
+import json
+
+import pytest
+
+from benchmarks.recipient_csv import (
+    TEMPLATES,
+    find_regressions,
+    generate_csv,
+    main,
+    run_benchmarks,
+)
+from notifications_utils.recipients import RecipientCSV
+
+
+@pytest.mark.parametrize("template_type", ["sms", "email"])
+def test_generate_csv_makes_valid_rows(template_type):
+    recipients = RecipientCSV(
+        generate_csv(template_type, 100), template=TEMPLATES[template_type]()
+    )
+
+    assert len(recipients) == 100
+    assert not recipients.has_errors
+
+
+@pytest.mark.parametrize("template_type", ["sms", "email"])
+def test_generate_csv_adds_errors(template_type):
+    recipients = RecipientCSV(
+        generate_csv(template_type, 100, error_rate=0.5),
+        template=TEMPLATES[template_type](),
+        max_errors_shown=100,
+    )
+
+    assert 0 < len(list(recipients.rows_with_errors)) < 100
+    assert list(recipients.rows_with_bad_recipients)
+    assert list(recipients.rows_with_missing_data)
+
+
+def test_generate_csv_adds_duplicate_placeholders_and_extra_columns():
+    file_data = generate_csv(
+        "sms", 1, duplicate_placeholders=True, extra_columns=2
+    ).splitlines()
+
+    assert file_data == [
+        "phone number,name,reference,Name,extra column 0,extra column 1",
+        "2028670000,Name 0,REF000000,Name 0,extra 0,extra 0",
+    ]
+
+
+def test_run_benchmarks_measures_each_operation():
+    results = run_benchmarks(sizes=(10,), template_types=("sms",), repeat=1)
+
+    assert [
+        (result["template_type"], result["rows"], result["operation"])
+        for result in results["results"]
+    ] == [
+        ("sms", 10, "len"),
+        ("sms", 10, "has_errors"),
+        ("sms", 10, "rows_with_errors"),
+        ("sms", 10, "get_row"),
+        ("sms", 10, "iterate_rows"),
+    ]
+    assert all(result["seconds"] > 0 for result in results["results"])
+    assert all(result["peak_memory_bytes"] > 0 for result in results["results"])
+
+
+def test_find_regressions():
+    def results(seconds, peak_memory_bytes):
+        return {
+            "results": [
+                {
+                    "template_type": "sms",
+                    "rows": 1000,
+                    "operation": "len",
+                    "seconds": seconds,
+                    "peak_memory_bytes": peak_memory_bytes,
+                }
+            ]
+        }
+
+    assert find_regressions(results(1, 100), results(1.1, 110), 0.2) == []
+    assert find_regressions(results(1, 100), results(1.5, 100), 0.2) == [
+        "sms 1000 rows len: seconds went from 1 to 1.5"
+    ]
+    assert find_regressions(results(1, 100), results(1, 200), 0.2) == [
+        "sms 1000 rows len: peak_memory_bytes went from 100 to 200"
+    ]
+
+
+def test_main_writes_results_and_fails_on_regressions(tmp_path):
+    output = tmp_path / "results.json"
+    arguments = ["--sizes", "10", "--operations", "len", "--repeat", "1"]
+
+    assert main(arguments + ["--output", str(output)]) == 0
+
+    baseline = json.loads(output.read_text())
+    assert len(baseline["results"]) == 2
+
+    for result in baseline["results"]:
+        result["seconds"] = 0
+    output.write_text(json.dumps(baseline))
+
+    assert main(arguments + ["--baseline", str(output)]) == 1
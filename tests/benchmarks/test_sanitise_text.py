@@ -0,0 +1,17 @@
+from benchmarks.sanitise_text import main, run_benchmarks
+
+
+def test_run_benchmarks_measures_both_ways_of_encoding():
+    results = run_benchmarks(sanitisers=("sms",), length=100)
+
+    assert [(result["sanitiser"], result["text"]) for result in results] == [
+        ("sms", "gsm"),
+        ("sms", "welsh"),
+        ("sms", "mixed"),
+    ]
+    assert all(result["encode_seconds"] > 0 for result in results)
+    assert all(result["encode_each_character_seconds"] > 0 for result in results)
+
+
+def test_main():
+    assert main(["--texts", "mixed", "--length", "100"]) == 0
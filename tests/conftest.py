@@ -16,6 +16,8 @@ import app.utils.api_health
 from app import create_app
 from app.enums import AuthType, ServicePermission
 from notifications_python_client.errors import HTTPError
+from notifications_utils.markdown import rendered_markdown
+from notifications_utils.template import rendered_previews
 from notifications_utils.url_safe_token import generate_token
 
 from . import (
@@ -580,6 +582,13 @@ def _disable_e2e_mode_for_unit_tests(monkeypatch, request):
         monkeypatch.delenv("NOTIFY_E2E_TEST_PASSWORD", raising=False)
 
 
+@pytest.fixture(autouse=True)
+def _clear_render_caches():
+    # Otherwise something rendered by one test could be used by another
+    rendered_previews.clear()
+    rendered_markdown.clear()
+
+
 SERVICE_ONE_ID = "596364a0-858e-42c8-9062-a8fe822260eb"
 SERVICE_TWO_ID = "147ad62a-2951-4fa1-9ca0-093cd1a52c52"
 ORGANISATION_ID = "c011fa40-4cbe-4524-b415-dde2f421bd9c"
@@ -1431,6 +1440,7 @@ def mock_create_job(mocker, api_user_active):
         original_file_name=None,
         notification_count=None,
         valid=None,
+        content_hash=None,
     ):
         return job_json(
             service_id,
@@ -1,6 +1,6 @@
 import pytest
 
-from notifications_utils.field import Field, str2bool
+from notifications_utils.field import Field, compile_field, str2bool
 
 
 @pytest.mark.parametrize(
@@ -309,3 +309,31 @@ def test_field_renders_lists_as_strings(values, expected, expected_as_markdown):
         == expected_as_markdown
     )
     assert str(Field("list: ((placeholder))", values)) == expected
+
+
+def test_field_content_is_sanitised_and_split_once(mocker):
+    compile_field.cache_clear()
+    strip_html = mocker.patch(
+        "notifications_utils.field.strip_html", side_effect=lambda value: value
+    )
+
+    for colour in ("red", "green", "blue"):
+        assert str(Field("the ((colour)) ((animal))", {"colour": colour})) == (
+            f"the {colour} <span class='placeholder'>((animal))</span>"
+        )
+
+    assert [call.args for call in strip_html.call_args_list] == [
+        ("the ((colour)) ((animal))",),
+        ("red",),
+        ("green",),
+        ("blue",),
+    ]
+
+
+def test_each_value_is_only_looked_up_once(mocker):
+    get_replacement = mocker.spy(Field, "get_replacement")
+
+    assert str(Field("((colour)) ((show??fox))", {"colour": "red", "show": "yes"})) == (
+        "red fox"
+    )
+    assert get_replacement.call_count == 1
@@ -0,0 +1,50 @@
+from unittest.mock import Mock
+
+from notifications_utils.lru_cache import LRUCache
+
+
+def test_get_or_set_only_makes_each_value_once():
+    cache = LRUCache(max_size_in_bytes=100, get_size=len)
+    make_value = Mock(return_value="value")
+
+    assert cache.get_or_set("key", make_value) == "value"
+    assert cache.get_or_set("key", make_value) == "value"
+
+    assert make_value.call_count == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.size_in_bytes == 5
+
+
+def test_least_recently_used_values_are_evicted_to_stay_under_max_size():
+    cache = LRUCache(max_size_in_bytes=10, get_size=len)
+
+    cache.set("a", "aaaa")
+    cache.set("b", "bbbb")
+    cache.get_or_set("a", Mock())
+    cache.set("c", "cccc")
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert len(cache) == 2
+    assert cache.size_in_bytes == 8
+
+
+def test_values_bigger_than_max_size_are_not_cached():
+    cache = LRUCache(max_size_in_bytes=10, get_size=len)
+
+    cache.set("a", "aaaa")
+    cache.set("a", "a" * 11)
+
+    assert "a" not in cache
+    assert cache.size_in_bytes == 0
+
+
+def test_clear():
+    cache = LRUCache(max_size_in_bytes=10, get_size=len)
+    cache.get_or_set("a", lambda: "aaaa")
+
+    cache.clear()
+
+    assert len(cache) == 0
+    assert (cache.size_in_bytes, cache.hits, cache.misses) == (0, 0, 0)
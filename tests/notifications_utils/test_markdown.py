@@ -1,8 +1,10 @@
 import pytest
 
+from notifications_utils import markdown
 from notifications_utils.markdown import (
     notify_email_markdown,
     notify_plain_text_email_markdown,
+    rendered_markdown,
 )
 
 
@@ -670,3 +672,21 @@ def test_strikethrough(markdown_function, expected):
 def test_footnotes():
     # Can’t work out how to test this
     pass
+
+
+def test_markdown_is_only_rendered_once_for_each_renderer(mocker):
+    email_markdown = mocker.spy(markdown, "_notify_email_markdown")
+    plain_text_markdown = mocker.spy(markdown, "_notify_plain_text_email_markdown")
+    text = "# Heading\n\nSee https://example.com"
+
+    html = notify_email_markdown(text)
+    plain_text = notify_plain_text_email_markdown(text)
+
+    assert notify_email_markdown(text) == html
+    assert notify_plain_text_email_markdown(text) == plain_text
+    assert html != plain_text
+    assert email_markdown.call_count == plain_text_markdown.call_count == 1
+    assert (rendered_markdown.hits, rendered_markdown.misses) == (2, 2)
+
+    notify_email_markdown(text + ".")
+    assert email_markdown.call_count == 2
@@ -1,5 +1,7 @@
 import itertools
+import pickle
 import string
+import tracemalloc
 import unicodedata
 from functools import partial
 from random import choice, randrange
@@ -9,8 +11,10 @@ import pytest
 from ordered_set import OrderedSet
 
 from notifications_utils import SMS_CHAR_COUNT_LIMIT
+from notifications_utils import recipients as recipients_module
 from notifications_utils.countries import Country
 from notifications_utils.formatters import strip_and_remove_obscure_whitespace
+from notifications_utils.insensitive_dict import InsensitiveDict
 from notifications_utils.recipients import (
     Cell,
     RecipientCSV,
@@ -370,29 +374,26 @@ def test_big_list_validates_right_through(
 
 
 @pytest.mark.parametrize(
-    ("template_type", "row_count", "header", "filler"),
+    ("template_type", "header", "recipient", "content", "value_length"),
     [
-        ("email", 50, "email address\n", "test@example.com\n"),
-        ("sms", 50, "phone number\n", "07900900123\n"),
+        ("email", "email address", "test@example.com", "((a)) " * 20, 99_999),
+        ("sms", "phone number", "07900900123", "((a)) " * 2, 458),
     ],
 )
-def test_check_if_message_too_long_for_sms_but_not_email_in_CSV(
-    mocker, template_type, row_count, header, filler
+def test_check_if_message_too_long_in_CSV(
+    template_type, header, recipient, content, value_length
 ):
-    # we do not validate email size for CSVs to avoid performance issues
-    RecipientCSV(
-        header + filler * row_count,
-        template=_sample_template(template_type),
-        max_errors_shown=100,
-        max_initial_rows_shown=3,
-    )
-    is_message_too_long = mocker.patch(
-        "notifications_utils.template.Template.is_message_too_long", side_effect=False
+    recipients = RecipientCSV(
+        f"{header},a\n"
+        f"{recipient},{'b' * value_length}\n"
+        f"{recipient},{'b' * (value_length + 1)}\n"
+        f"{recipient},{'b b' * (value_length // 3 + 1)}\n",
+        template=_sample_template(template_type, content=content),
+        allow_international_sms=True,
     )
-    if template_type == "email":
-        is_message_too_long.assert_not_called
-    else:
-        is_message_too_long.called
+
+    assert [row.message_too_long for row in recipients] == [False, True, True]
+    assert _index_rows(recipients.rows_with_message_too_long) == {1, 2}
 
 
 def test_overly_big_list_stops_processing_rows_beyond_max(mocker):
@@ -413,6 +414,7 @@ def test_overly_big_list_stops_processing_rows_beyond_max(mocker):
     # Our CSV has lots of rows…
     assert big_csv.too_many_rows
     assert len(big_csv) == 123
+    assert len(big_csv.rows) == 123
 
     # …but we’ve only called the expensive whitespace function on each
     # of the 2 cells in the first 10 rows
@@ -1347,7 +1349,7 @@ def test_email_validation_speed():
 @pytest.mark.parametrize("should_validate", [True, False])
 def test_recipient_csv_checks_should_validate_flag(should_validate):
     template = _sample_template("sms")
-    template.is_message_empty = Mock(return_value=False)
+    template.content_count_without_prefix_for = Mock(return_value=1)
 
     recipients = RecipientCSV(
         """phone number,name
@@ -1361,5 +1363,363 @@ def test_recipient_csv_checks_should_validate_flag(should_validate):
 
     list(recipients.get_rows())
 
-    assert template.is_message_empty.called is should_validate
+    assert template.content_count_without_prefix_for.called is should_validate
     assert recipients._get_error_for_field.called is should_validate
+
+
+def test_summary_counts_every_kind_of_error_in_one_pass(mocker):
+    recipients = RecipientCSV(
+        """
+            phone number, name
+            2348675309, Alice
+            12345, Bob
+            2348675309,
+            , Dave
+        """,
+        template=_sample_template("sms", "hello ((name))"),
+        max_errors_shown=2,
+    )
+    get_row = mocker.spy(recipients, "_get_row")
+
+    summary = recipients.summary
+
+    assert get_row.call_count == 4
+    assert summary.row_count == 4
+    assert summary.count_of_rows_with_errors == 3
+    assert summary.count_of_rows_with_bad_recipients == 1
+    assert summary.count_of_rows_with_missing_data == 2
+    assert summary.count_of_rows_with_message_too_long == 0
+    assert summary.count_of_rows_with_empty_message == 0
+    assert [row.index for row in summary.initial_rows_with_errors] == [1, 2]
+    assert summary.recipients == {"2348675309", "12345"}
+    assert summary.stopped_early is False
+
+    # Reading the other properties doesn’t validate the file again
+    assert recipients.has_errors
+    assert len(recipients) == 4
+    assert len(list(recipients.displayed_rows)) == 2
+    assert get_row.call_count == 4
+
+
+def test_has_errors_validates_each_row_once(mocker):
+    recipients = RecipientCSV(
+        "phone number, name\n" + ("2348675309, Alice\n" * 5) + "12345, Bob\n",
+        template=_sample_template("sms", "hello ((name))"),
+        remaining_messages=10,
+    )
+    get_row = mocker.spy(recipients, "_get_row")
+
+    assert recipients.has_errors
+    assert get_row.call_count == 6
+
+    assert len(recipients) == 6
+    assert get_row.call_count == 6
+
+
+def test_summary_stops_validating_once_there_are_too_many_rows(mocker):
+    recipients = RecipientCSV(
+        "phone number\n" + ("2348675309\n" * 10),
+        template=_sample_template("sms"),
+    )
+    recipients.max_rows = 3
+    get_row = mocker.spy(recipients, "_get_row")
+
+    assert recipients.summary.stopped_early is True
+    assert recipients.summary.row_count == 10
+    assert get_row.call_count == 3
+    assert len(recipients) == 10
+    assert recipients.too_many_rows
+    assert recipients.has_errors
+
+
+@pytest.mark.parametrize("remaining_messages", [3, 0, -1])
+@pytest.mark.parametrize("chunk_size", [None, 2])
+def test_summary_validates_rows_past_the_number_of_messages_left(
+    remaining_messages, chunk_size
+):
+    recipients = RecipientCSV(
+        "phone number\n"
+        + ("2348675309\n" * 4)
+        + "12345\n"
+        + "2348675301\n"
+        + ("2348675309\n" * 6),
+        template=_sample_template("sms"),
+        guestlist=["2348675309", "12345"],
+        remaining_messages=remaining_messages,
+    )
+    summary = (
+        recipients.summarise_in_chunks(chunk_size) if chunk_size else recipients.summary
+    )
+
+    assert summary.stopped_early is False
+    assert summary.row_count == 12
+    assert summary.count_of_rows_with_bad_recipients == 1
+    assert [row.index for row in summary.initial_rows] == list(range(10))
+    assert [row.index for row in summary.initial_rows_with_errors] == [4]
+    assert summary.allowed_to_send_to is False
+    assert summary.disallowed_recipients == ["2348675301"]
+    assert recipients.more_rows_than_can_send
+    assert recipients.has_errors
+    assert [row.index for row in recipients.displayed_rows] == [4]
+
+
+def test_get_row_only_builds_the_requested_row(mocker):
+    recipients = RecipientCSV(
+        """
+            phone number, colour
+            07700 90000 1, red
+            07700 90000 2, green
+            07700 90000 3, blue
+        """,
+        template=_sample_template("sms"),
+    )
+    get_row = mocker.spy(recipients, "_get_row")
+
+    assert recipients.get_row(1)["colour"].data == "green"
+    assert get_row.call_count == 1
+    assert recipients.rows_as_list is None
+
+    with pytest.raises(IndexError):
+        recipients.get_row(3)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 100])
+def test_summarise_in_chunks_matches_single_pass(chunk_size):
+    file_contents = """
+        phone number, name
+        2348675309, Alice
+        12345, Bob
+        2348675309,
+        , Dave
+        2348675301, "Eve
+        Smith"
+        2348675302, Frank
+    """
+
+    def _recipients():
+        return RecipientCSV(
+            file_contents,
+            template=_sample_template("sms", "hello ((name))"),
+            max_errors_shown=2,
+            max_initial_rows_shown=3,
+            guestlist=["2348675309"],
+        )
+
+    single_pass = _recipients().summary
+    map_fn = Mock(side_effect=map)
+    chunked = _recipients().summarise_in_chunks(chunk_size, map_fn=map_fn)
+
+    assert map_fn.call_count == 1
+    assert chunked.row_count == single_pass.row_count == 6
+    for attr in (
+        "count_of_rows_with_errors",
+        "count_of_rows_with_bad_recipients",
+        "count_of_rows_with_missing_data",
+        "recipients",
+        "allowed_to_send_to",
+        "stopped_early",
+    ):
+        assert getattr(chunked, attr) == getattr(single_pass, attr)
+    for attr in ("initial_rows", "initial_rows_with_errors"):
+        assert [row.index for row in getattr(chunked, attr)] == [
+            row.index for row in getattr(single_pass, attr)
+        ]
+
+
+def test_summarise_in_chunks_only_validates_rows_up_to_max_rows():
+    recipients = RecipientCSV(
+        "phone number\n" + ("2348675309\n" * 10),
+        template=_sample_template("sms"),
+    )
+    recipients.max_rows = 3
+
+    summary = recipients.summarise_in_chunks(2)
+
+    assert summary.row_count == 10
+    assert summary.stopped_early is True
+    assert len(recipients) == 10
+    assert recipients.too_many_rows
+
+
+def test_rows_store_values_without_a_cell_object_per_value():
+    column_headers = ["phone number"] + [f"column {i}" for i in range(9)]
+    recipients = RecipientCSV(
+        ",".join(column_headers)
+        + "\n"
+        + "\n".join(
+            "2348675309," + ",".join(f"value {i} {j}" for j in range(9))
+            for i in range(1000)
+        ),
+        template=_sample_template(
+            "sms", " ".join(f"(({header}))" for header in column_headers[1:])
+        ),
+    )
+
+    tracemalloc.start()
+    try:
+        rows = recipients.rows
+        memory_used, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # This was about 2,150 bytes per row when every row held a `Cell`
+    # object (with its own `__dict__`) for every value
+    assert memory_used / len(rows) < 1_200
+    assert not hasattr(rows[0], "__dict__")
+    assert rows[0].errors is None
+    assert rows[0]["column 1"] == Cell(
+        "column 1", "value 0 1", placeholders=recipients.placeholders_as_column_keys
+    )
+    # Rows are sent back from the validation process pool
+    assert pickle.loads(pickle.dumps(rows[0])).items() == rows[0].items()
+
+
+def test_row_offsets_let_rows_be_read_without_parsing_the_whole_file(mocker):
+    recipients = RecipientCSV(
+        'phone number, name\n2348675301, "Alice\nSmith"\n\n2348675302, Bob',
+        template=_sample_template("sms", "hello ((name))"),
+    )
+
+    assert len(recipients.row_offsets) == recipients.count_rows() == 3
+
+    get_row = mocker.spy(recipients, "_get_row")
+
+    assert recipients[2]["name"].data == "Bob"
+    assert recipients[-3]["name"].data == "Alice\nSmith"
+    assert recipients[1].recipient is None
+    assert get_row.call_count == 3
+    assert recipients.rows_as_list is None
+
+
+def test_reading_the_header_or_one_row_doesnt_copy_the_file():
+    recipients = RecipientCSV(
+        "\r\n  phone number, name\r\n"
+        + "".join(f"2348675309, Name {i}\r\n" for i in range(10_000))
+        + "\r\n,,\r\n",
+        template=_sample_template("sms", "hello ((name))"),
+    )
+    row_offsets = recipients.row_offsets
+    recipients.get_row(0)  # fill any caches used when validating a row
+
+    tracemalloc.start()
+    try:
+        assert recipients.column_headers == ["phone number", "name"]
+        assert recipients.get_row(9_999)["name"].data == "Name 9999"
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # The file is about 230,000 characters long
+    assert peak_memory < 20_000
+    assert len(row_offsets) == len(recipients.rows) == 10_000
+
+
+def test_columns_are_normalised_once_per_file(mocker):
+    recipients = RecipientCSV(
+        "Phone_Number,NAME,name,colour,extra\n"
+        "2028675301,Bob,,blue,,,\n"
+        "2028675309,Alice,Alicia,red\n",
+        template=_sample_template("sms", "hello ((name))"),
+        should_validate=False,
+    )
+
+    assert recipients.columns == (
+        ("Phone_Number", "phonenumber", True, True, False),
+        ("NAME", "name", False, True, False),
+        ("name", "name", False, True, False),
+        ("colour", "colour", False, False, False),
+        ("extra", "extra", False, False, False),
+    )
+
+    make_key = mocker.patch.object(
+        InsensitiveDict, "make_key", wraps=InsensitiveDict.make_key
+    )
+
+    rows = list(recipients.rows)
+
+    assert make_key.called is False
+    assert dict(dict.items(rows[0])) == {
+        "phonenumber": "2028675301",
+        "name": None,
+        "colour": "blue",
+        "extra": None,
+        None: ["", ""],
+    }
+    assert dict(dict.items(rows[1])) == {
+        "phonenumber": "2028675309",
+        "name": "Alicia",
+        "colour": "red",
+        "extra": None,
+    }
+
+
+def test_sms_rows_are_checked_without_rendering_each_message(mocker):
+    template = _sample_template("sms", "Hi ((name)), your reference is ((ref))")
+    render = mocker.patch.object(
+        SMSMessageTemplate,
+        "_get_unsanitised_content",
+        autospec=True,
+        side_effect=SMSMessageTemplate._get_unsanitised_content,
+    )
+    recipients = RecipientCSV(
+        "phone number,name,ref\n"
+        + "\n".join(f"202867530{n},Name{n},REF{n}" for n in range(5))
+        + "\n2028675309,,REF\n2028675309,Alice  Smith,REF",
+        template=template,
+    )
+
+    assert not list(recipients.rows_with_message_too_long)
+    assert [row.index for row in recipients.rows_with_missing_data] == [5]
+    # the message is only rendered for the rows with an empty value or
+    # whitespace which needs normalising, and once to work out the length
+    # of everything else
+    assert render.call_count == 3
+
+
+def test_columns_are_reset_when_the_template_changes():
+    recipients = RecipientCSV(
+        "phone number,name\n2028675309,Alice",
+        template=_sample_template("sms", "hello"),
+    )
+    assert recipients.columns[1].is_placeholder is False
+
+    recipients.template = _sample_template("sms", "hello ((name))")
+
+    assert recipients.columns[1].is_placeholder is True
+
+
+def test_guestlist_is_normalised_once_and_disallowed_recipients_are_reported(
+    mocker,
+):
+    format_recipient = mocker.patch(
+        "notifications_utils.recipients.format_recipient",
+        wraps=recipients_module.format_recipient,
+    )
+
+    recipients = RecipientCSV(
+        """
+            phone number
+            2348675309
+            2348675301
+            2348675302
+            2348675303
+            +1 234 867 5309
+        """,
+        template=_sample_template("sms"),
+        guestlist=["+12348675309", "12348675302", "Test User", "test@example.com"],
+        max_errors_shown=1,
+    )
+
+    assert recipients.guestlist_index == {
+        "+12348675309",
+        "+12348675302",
+        "Test User",
+        "test@example.com",
+    }
+    assert format_recipient.call_count == 4
+
+    assert recipients.allowed_to_send_to is False
+    assert recipients.summary.disallowed_recipients == ["2348675301"]
+    # Rows are looked up in the index, rather than the guest list being
+    # formatted again for every row, until enough have been reported
+    assert format_recipient.call_count == 4 + 2
@@ -1,5 +1,7 @@
+import phonenumbers
 import pytest
 
+from notifications_utils import hostname_part
 from notifications_utils.recipients import (
     InvalidEmailError,
     InvalidPhoneError,
@@ -7,11 +9,13 @@ from notifications_utils.recipients import (
     format_phone_number_human_readable,
     format_recipient,
     get_international_phone_info,
+    get_parsed_phone_number,
     international_phone_info,
     is_us_phone_number,
     try_validate_and_format_phone_number,
     validate_and_format_phone_number,
     validate_email_address,
+    validate_email_addresses,
     validate_phone_number,
 )
 
@@ -348,6 +352,31 @@ def test_validate_email_address_raises_for_invalid(email_address):
     assert str(e.value) == "Not a valid email address"
 
 
+def test_validate_email_addresses_validates_each_address():
+    assert validate_email_addresses(
+        valid_email_addresses + invalid_email_addresses + (" email@domain.com ",)
+    ) == (
+        list(valid_email_addresses)
+        + [None] * len(invalid_email_addresses)
+        + ["email@domain.com"]
+    )
+
+
+def test_validate_email_address_only_checks_each_domain_once(mocker):
+    mock_hostname_part = mocker.patch(
+        "notifications_utils.recipients.hostname_part", wraps=hostname_part
+    )
+
+    validate_email_addresses(
+        f"{name}@a-new-domain-{n}.example.com"
+        for n in range(2)
+        for name in ("first", "second", "third")
+    )
+
+    # Three parts in each of the two domains
+    assert mock_hostname_part.match.call_count == 3 * 2
+
+
 @pytest.mark.parametrize("phone_number", valid_us_phone_numbers)
 def test_validates_against_guestlist_of_phone_numbers(phone_number):
     assert allowed_to_send_to(
@@ -422,3 +451,33 @@ def test_try_format_recipient_doesnt_throw():
 
 def test_format_phone_number_human_readable_doenst_throw():
     assert format_phone_number_human_readable("ALPHANUM3R1C") == "ALPHANUM3R1C"
+
+
+@pytest.mark.parametrize("international", [True, False])
+def test_validating_the_same_phone_number_again_does_not_parse_it_again(
+    mocker, international
+):
+    get_parsed_phone_number.cache_clear()
+    mock_parse = mocker.patch(
+        "notifications_utils.recipients.phonenumbers.parse",
+        wraps=phonenumbers.parse,
+    )
+
+    for _ in range(3):
+        assert (
+            validate_phone_number("+44 7700 900 460", international=True)
+            == "+447700900460"
+        )
+        with pytest.raises(InvalidPhoneError) as exception:
+            validate_phone_number("202 555 010", international=international)
+        assert str(exception.value) == "Not enough digits"
+    get_international_phone_info("+44 7700 900 460")
+    format_phone_number_human_readable("+44 7700 900 460")
+
+    assert [call.args for call in mock_parse.call_args_list] == [
+        ("+44 7700 900 460", "US"),
+        ("+44 7700 900 460", None),
+        ("202 555 010", "US"),
+        ("+447700900460", "US"),
+        ("+447700900460", None),
+    ]
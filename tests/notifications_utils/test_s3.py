@@ -1,3 +1,4 @@
+from io import BytesIO
 from urllib.parse import parse_qs
 
 import botocore
@@ -108,3 +109,27 @@ def test_s3download_raises_on_error(mocker):
 
     with pytest.raises(S3ObjectNotFound):
         s3download("bucket", "location.file")
+
+
+def test_s3upload_streams_file_like_objects(mocker):
+    mocked = mocker.patch("notifications_utils.s3.Session.resource")
+    filedata = BytesIO(b"some file data")
+    s3upload(
+        filedata=filedata,
+        region=region,
+        bucket_name=bucket,
+        file_location=location,
+        metadata={"status": "valid"},
+    )
+    mocked_object = mocked.return_value.Object.return_value
+    assert mocked_object.put.called is False
+    mocked_object.upload_fileobj.assert_called_once_with(
+        filedata,
+        ExtraArgs={
+            "ServerSideEncryption": "AES256",
+            "ContentType": content_type,
+            "Metadata": {"status": "valid"},
+        },
+        Config=mocker.ANY,
+    )
+    assert mocked_object.upload_fileobj.call_args[1]["Config"].use_threads is False
@@ -1,6 +1,11 @@
 import pytest
 
-from notifications_utils.sanitise_text import SanitiseASCII, SanitiseSMS, SanitiseText
+from notifications_utils.sanitise_text import (
+    EncodingTable,
+    SanitiseASCII,
+    SanitiseSMS,
+    SanitiseText,
+)
 
 params, ids = zip(
     (("a", "a"), "ascii char (a)"),
@@ -311,3 +316,40 @@ def test_sms_supporting_additional_languages(content, expected):
 )
 def test_get_non_compatible_characters(content, expected):
     assert SanitiseSMS.get_non_compatible_characters(content) == expected
+
+
+@pytest.mark.parametrize("cls", [SanitiseSMS, SanitiseASCII])
+def test_encode_gives_the_same_result_as_encoding_each_character(cls):
+    content = "".join(map(chr, range(0x250))) + "–—…‘’“”\u200b\ufeffẁ€Привет你好👋𐤓"
+
+    assert cls.encode(content) == "".join(map(cls.encode_char, content))
+
+
+def test_each_character_is_only_encoded_once(mocker):
+    class SanitiseExample(SanitiseSMS):
+        pass
+
+    encode_char = mocker.spy(SanitiseExample, "encode_char")
+
+    assert SanitiseExample.encode("Привет – Привет") == "Привет - Привет"
+    assert SanitiseExample.get_non_compatible_characters("Привет 👋") == {"👋"}
+    assert sorted(call.args[0] for call in encode_char.call_args_list) == sorted(
+        "Привет–👋"
+    )
+    assert SanitiseExample.get_encoding_table() is not (
+        SanitiseSMS.get_encoding_table()
+    )
+
+
+def test_encoding_table_stops_storing_characters_once_full(mocker):
+    class SanitiseExample(SanitiseSMS):
+        pass
+
+    mocker.patch.object(
+        EncodingTable, "max_size", len(SanitiseSMS.ALLOWED_CHARACTERS) + 2
+    )
+    encode_char = mocker.spy(SanitiseExample, "encode_char")
+
+    assert SanitiseExample.encode("Привет Привет") == "Привет Привет"
+    assert len(SanitiseExample.get_encoding_table()) == EncodingTable.max_size
+    assert encode_char.call_count == 2 + 2 * 4
@@ -10,6 +10,8 @@ from freezegun import freeze_time
 from markupsafe import Markup
 from ordered_set import OrderedSet
 
+from notifications_utils.insensitive_dict import InsensitiveDict
+from notifications_utils.recipients import RecipientCSV
 from notifications_utils.template import (
     BaseBroadcastTemplate,
     BaseEmailTemplate,
@@ -27,6 +29,7 @@ from notifications_utils.template import (
     SMSPreviewTemplate,
     SubjectMixin,
     Template,
+    rendered_previews,
 )
 
 
@@ -1567,6 +1570,50 @@ def test_sms_fragment_count_accounts_for_non_latin_characters(
     assert template.fragment_count == expected_sms_fragment_count
 
 
+@pytest.mark.parametrize("prefix", [None, "GDS"])
+@pytest.mark.parametrize(
+    ("content", "values"),
+    [
+        ("Hello ((name))", {"name": "Alice"}),
+        ("Hello ((name))", {"name": "Alice Smith-Jones"}),
+        ("Hello ((name)), ((NAME))", {"name": "Alice"}),
+        ("Hello ((name)).", {"name": "Alice "}),
+        ("Hello ((name))", {"name": "Alice  Smith"}),
+        ("Hello ((name))", {"name": "Alice\nSmith"}),
+        ("Hello ((name))", {"name": "Alice\u00a0Smith"}),
+        ("Hello ((name))", {"name": "Alice\u200bSmith"}),
+        ("Hello ((name))", {"name": "Siân"}),
+        ("Hello ((name))", {"name": "Анна"}),
+        ("Hello ((name))", {"name": "Ali…ce"}),
+        ("Hello ((name)) ((ref))", {"name": "x" * 150, "ref": "REF123"}),
+        ("((name))", {"name": ""}),
+        ("((name))", {"name": "  "}),
+        ("Hello ((name))", {"name": "Alice ,"}),
+        ("Hello ((name))", {"name": ["Alice", "Bob"]}),
+        ("Hello ((name))", {"name": None}),
+        ("Hello ((name))", {}),
+        ("Hello ((name??Alice))", {"name": "yes"}),
+        ("Price: ((price)) ((currency))", {"price": "£10", "currency": "€"}),
+    ],
+)
+def test_sms_content_counts_for_values_match_rendering_the_message(
+    content, values, prefix
+):
+    template = SMSMessageTemplate(
+        {"content": content, "template_type": "sms"}, prefix=prefix
+    )
+    values = InsensitiveDict(values)
+
+    content_count = template.content_count_without_prefix_for(values)
+    fragment_count = template.fragment_count_for(values)
+
+    rendered = SMSMessageTemplate(
+        {"content": content, "template_type": "sms"}, values, prefix=prefix
+    )
+    assert content_count == rendered.content_count_without_prefix
+    assert fragment_count == rendered.fragment_count
+
+
 @pytest.mark.parametrize(
     "template_class",
     [
@@ -2738,6 +2785,84 @@ def test_message_too_long_for_an_email_message_within_limits(
     assert template.is_message_too_long() is False
 
 
+@pytest.mark.parametrize("prefix", [None, "GDS"])
+@pytest.mark.parametrize(
+    "content",
+    [
+        "Hello ((name)), your reference is ((ref)) ((name))",
+        "Hello there",
+        "((name))",
+        "((name??Hello))",
+    ],
+)
+def test_sms_fragment_counts_for_many_rows_match_rendering_each_message(
+    content, prefix
+):
+    rows = [
+        InsensitiveDict(values)
+        for values in [
+            {"name": "Alice", "ref": "REF123"},
+            {"name": "Siân", "ref": "ŵ"},
+            {"name": "Анна", "ref": "REF123"},
+            {"name": "Ali…ce 😀", "ref": "‘quoted’"},
+            {"name": "x" * 200, "ref": "y" * 200},
+            {"name": "Ж" * 100, "ref": "REF"},
+            {"name": "Alice  Smith", "ref": "REF, 123."},
+            {"name": "", "ref": "REF123"},
+            {"name": None},
+            {},
+        ]
+    ]
+    template = SMSMessageTemplate(
+        {"content": content, "template_type": "sms"}, prefix=prefix
+    )
+
+    fragment_counts, total = template.fragment_counts_for(iter(rows))
+
+    assert fragment_counts == [
+        SMSMessageTemplate(
+            {"content": content, "template_type": "sms"}, row, prefix=prefix
+        ).fragment_count
+        for row in rows
+    ]
+    assert total == sum(fragment_counts)
+
+
+def test_sms_fragment_counts_for_no_rows():
+    template = SMSMessageTemplate({"content": "((name))", "template_type": "sms"})
+
+    assert template.fragment_counts_for([]) == ([], 0)
+
+
+@pytest.mark.parametrize(
+    ("content", "values"),
+    [
+        ("Hello ((name))", {"name": "Alice"}),
+        ("Hello ((name)), ((NAME))", {"name": "Alice Smith"}),
+        ("((name))", {"name": "Siân\n\n* one\n* two"}),
+        ("  ((name))  \n", {"name": "Alice"}),
+        ("((name))", {"name": ""}),
+        ("((name))", {"name": " Alice"}),
+        ("((name))", {"name": ["Alice", "Bob"]}),
+        ("((name))", {"name": None}),
+        ("Hello ((name))", {}),
+        ("Hello ((name??Alice))", {"name": "yes"}),
+    ],
+)
+def test_email_content_size_for_values_matches_filling_in_placeholders(content, values):
+    template = HTMLEmailTemplate(
+        {"content": content, "subject": "foo", "template_type": "email"}
+    )
+    values = InsensitiveDict(values)
+
+    filled_in = HTMLEmailTemplate(
+        {"content": content, "subject": "foo", "template_type": "email"}, values
+    )
+    assert template.content_size_in_bytes_for(values) == (
+        filled_in.content_size_in_bytes
+    )
+
+
 # @pytest.mark.parametrize(
 #     ("content", "expected_preview_markup"),
 #     [
@@ -3335,3 +3460,89 @@ def test_broadcast_message_single_counts_diacritics_in_gsm(
     )
     assert template.encoded_content_count == 1
     assert template.max_content_count == 1_395
+
+
+@pytest.mark.parametrize(
+    ("template_class", "template_type", "extra_args"),
+    [
+        (SMSPreviewTemplate, "sms", {"prefix": "Service name"}),
+        (BroadcastPreviewTemplate, "broadcast", {}),
+        (EmailPreviewTemplate, "email", {"from_name": "Service name"}),
+    ],
+)
+def test_previews_are_only_rendered_once(
+    mocker, template_class, template_type, extra_args
+):
+    template = {
+        "id": "1234",
+        "version": 2,
+        "content": "Hello ((name))",
+        "subject": "Hi",
+        "template_type": template_type,
+    }
+    render = mocker.spy(template_class.jinja_template, "render")
+
+    def preview(**kwargs):
+        return str(template_class(**{"template": template, **extra_args, **kwargs}))
+
+    first_render = preview()
+
+    assert preview() == first_render
+    assert render.call_count == 1
+
+    assert "hidden" in preview(redact_missing_personalisation=True)
+    template["content"] = "Goodbye ((name))"
+    assert "Goodbye" in preview()
+    assert render.call_count == 3
+
+    assert preview() != first_render
+    assert render.call_count == 3
+
+
+@pytest.mark.parametrize(
+    ("template_class", "template_type", "extra_args"),
+    [
+        (SMSPreviewTemplate, "sms", {"prefix": "Service name"}),
+        (BroadcastPreviewTemplate, "broadcast", {}),
+        (EmailPreviewTemplate, "email", {"from_name": "Service name"}),
+    ],
+)
+def test_previews_with_personalisation_are_not_cached(
+    mocker, template_class, template_type, extra_args
+):
+    template = {
+        "id": "1234",
+        "version": 2,
+        "content": "Hello ((name))",
+        "subject": "Hi",
+        "template_type": template_type,
+    }
+    render = mocker.spy(template_class.jinja_template, "render")
+
+    for _ in range(2):
+        assert "Alice" in str(
+            template_class(template, values={"name": "Alice"}, **extra_args)
+        )
+
+    assert render.call_count == 2
+    assert len(rendered_previews) == 0
+
+
+def test_previews_can_be_rendered_for_rows_with_more_cells_than_columns():
+    template = {
+        "id": "1234",
+        "version": 2,
+        "content": "Hi ((name))",
+        "template_type": "sms",
+    }
+    row = RecipientCSV(
+        "phone number,name\n2028675309,Alice,extra cell",
+        template=SMSPreviewTemplate(template),
+    ).get_row(0)
+
+    preview = SMSPreviewTemplate(template, row.recipient_and_personalisation)
+
+    assert None in preview.values
+    assert str(preview) == str(
+        SMSPreviewTemplate(template, {"name": "Alice", "phone number": "2028675309"})
+    )